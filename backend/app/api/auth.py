@@ -1,11 +1,15 @@
+from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from beanie import PydanticObjectId
 from ..core.config import settings
-from ..core.security import get_password_hash, verify_password, create_access_token, create_refresh_token
+from ..core.security import get_password_hash_async, verify_password_async, password_needs_rehash
 from ..models.user import User
+from ..models.token import RefreshToken
+from ..services.revocation import revocation_list
 from ..schemas.user import UserCreate, UserLogin, Token, TokenData
-from .deps import get_current_user, get_my_permissions
+from .deps import get_current_user, get_my_permissions, issue_tokens
 
 router = APIRouter()
 
@@ -20,67 +24,77 @@ async def register(user_in: UserCreate):
     
     new_user = User(
         email=user_in.email,
-        password_hash=get_password_hash(user_in.password)
+        password_hash=await get_password_hash_async(user_in.password)
     )
     await new_user.insert()
     
-    extra_claims = {
-        "user_id": str(new_user.id),
-        "active_company_id": str(new_user.active_company_id) if new_user.active_company_id else None
-    }
-    
-    return {
-        "access_token": create_access_token(new_user.email, extra_claims=extra_claims),
-        "refresh_token": create_refresh_token(new_user.email),
-        "token_type": "bearer"
-    }
+    return await issue_tokens(new_user)
 
 @router.post("/login", response_model=Token)
 async def login(user_in: UserLogin):
     user = await User.find_one(User.email == user_in.email)
-    if not user or not verify_password(user_in.password, user.password_hash):
+    if not user or not await verify_password_async(user_in.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+
+    # Upgrade hashes made with an older cost while we still have the plain password
+    if password_needs_rehash(user.password_hash):
+        await user.set({User.password_hash: await get_password_hash_async(user_in.password)})
     
-    extra_claims = {
-        "user_id": str(user.id),
-        "active_company_id": str(user.active_company_id) if user.active_company_id else None
-    }
-    
-    return {
-        "access_token": create_access_token(user.email, extra_claims=extra_claims),
-        "refresh_token": create_refresh_token(user.email),
-        "token_type": "bearer"
-    }
+    return await issue_tokens(user)
 
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(refresh_token: str):
+    """
+    Rotates a refresh token: it is marked used and a new pair in the same
+    session is returned. Presenting an already used token again revokes the
+    whole session, since either the client or an attacker holds a stolen copy,
+    unless it comes within REFRESH_REUSE_GRACE_SECONDS of the first use: that
+    is concurrent refreshes from one client and only the late one is refused.
+    """
     try:
         payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
         is_refresh: bool = payload.get("refresh")
-        if email is None or not is_refresh:
+        token_id: str = payload.get("jti")
+        family: str = payload.get("fam")
+        if email is None or not is_refresh or not token_id or not family:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
-        
-    user = await User.find_one(User.email == email)
+
+    if await revocation_list.is_revoked(token_id, family):
+        raise HTTPException(status_code=401, detail="Refresh token has been revoked")
+
+    # Atomic: of two refreshes racing with the same token only one gets a record back
+    record = await RefreshToken.get_motor_collection().find_one_and_update(
+        {"jti": token_id, "used_at": None}, {"$set": {"used_at": datetime.utcnow()}}
+    )
+    if record is None:
+        used = await RefreshToken.find_one(RefreshToken.jti == token_id)
+        if used is not None:
+            grace = timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS)
+            if used.used_at and datetime.utcnow() - used.used_at <= grace:
+                raise HTTPException(status_code=401, detail="Refresh token already used")
+            await revoke_session(family, used.user_id)
+            raise HTTPException(status_code=401, detail="Refresh token reuse detected")
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user = await User.get(record["user_id"])
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-        
-    extra_claims = {
-        "user_id": str(user.id),
-        "active_company_id": str(user.active_company_id) if user.active_company_id else None
-    }
-    
-    return {
-        "access_token": create_access_token(user.email, extra_claims=extra_claims),
-        "refresh_token": create_refresh_token(user.email),
-        "token_type": "bearer"
-    }
+
+    return await issue_tokens(user, family)
+
+
+async def revoke_session(family: str, user_id: PydanticObjectId):
+    """Revokes every access and refresh token issued under a refresh family."""
+    # No token of the family can be issued after this, and all existing ones expire within the window
+    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await revocation_list.revoke(family, "family", expires_at, user_id)
 
 
 @router.get("/permissions")
@@ -88,7 +102,14 @@ async def get_current_permissions(permissions: set[str] = Depends(get_my_permiss
     return list(permissions)
 
 @router.post("/logout")
-async def logout():
-    # In a simple JWT setup, logout is usually handled on the client side by discarding the token.
-    # For a more secure setup, you could blacklist tokens in Redis.
+async def logout(request: Request):
+    """Ends the caller's session: this access token and every token from the same login."""
+    user_id = PydanticObjectId(request.state.user_id)
+    family = getattr(request.state, "token_family", None)
+    token_id = getattr(request.state, "token_id", None)
+    if family:
+        await revoke_session(family, user_id)
+    elif token_id:
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        await revocation_list.revoke(token_id, "token", expires_at, user_id)
     return {"detail": "Successfully logged out"}
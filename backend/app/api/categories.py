@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Literal
 from beanie import PydanticObjectId
 from ..schemas.category import ItemCategoryCreate, ItemCategoryUpdate, ItemCategoryOut
 from ..repositories.master_repos import category_repo
 from ..services.master_service import master_service
 from ..api.deps import PermissionChecker
+from ..api.pagination import PageParams, set_page_headers
 
 router = APIRouter()
 
@@ -14,17 +15,18 @@ async def create_category(data: ItemCategoryCreate):
 
 @router.get("/", response_model=List[ItemCategoryOut], dependencies=[Depends(PermissionChecker("categories.view"))])
 async def list_categories(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    page_params: PageParams = Depends(),
     search: str = Query(None),
+    search_mode: Literal["prefix", "contains"] = "prefix",
     include_inactive: bool = False
 ):
-    query = category_repo.query()
-    if not include_inactive:
-        query = query.find(category_repo.model.is_active == True)
+    filters = {}
     if search:
-        query = query.find({"name": {"$regex": search, "$options": "i"}})
-    return await query.skip(skip).limit(limit).to_list()
+        filters.update(category_repo.search_filter(search, contains=search_mode == "contains"))
+    page = await category_repo.list_page(filters, include_inactive, **page_params.as_kwargs())
+    set_page_headers(response, page)
+    return page.items
 
 @router.delete("/{id}", dependencies=[Depends(PermissionChecker("categories.delete"))])
 async def delete_category(id: PydanticObjectId):
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from typing import List
 from beanie import PydanticObjectId
 from ..models.company import Company
 from ..models.user import User
 from ..schemas.company import CompanyCreate, CompanyOut, CompanyUpdate
 from ..schemas.user import Token, UserOut
-from .deps import get_current_user
+from .deps import get_current_user, issue_tokens
 from ..services.role_service import init_company_roles, assign_admin_role
+from ..services.dashboard_service import dashboard_service
 
 router = APIRouter()
 
@@ -35,6 +36,7 @@ async def create_company(
     # Initialize roles and assign admin
     await init_company_roles(new_company.id)
     await assign_admin_role(current_user, new_company.id)
+    dashboard_service.invalidate(new_company.id)
     
     return new_company
 
@@ -88,11 +90,13 @@ async def update_company(
         setattr(company, key, value)
         
     await company.save()
+    dashboard_service.invalidate(cid)
     return company
 
 @router.post("/select/{company_id}", response_model=Token)
 async def select_active_company(
     company_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -108,19 +112,8 @@ async def select_active_company(
     current_user.active_company_id = cid
     await current_user.save()
     
-    # Generate new tokens with the updated active_company_id
-    from ..core.security import create_access_token, create_refresh_token
-    
-    extra_claims = {
-        "user_id": str(current_user.id),
-        "active_company_id": str(current_user.active_company_id)
-    }
-    
-    return {
-        "access_token": create_access_token(current_user.email, extra_claims=extra_claims),
-        "refresh_token": create_refresh_token(current_user.email),
-        "token_type": "bearer"
-    }
+    # Generate new tokens with the updated active_company_id, in the same session
+    return await issue_tokens(current_user, getattr(request.state, "token_family", None))
 
 @router.get("/{company_id}/users", response_model=list[UserOut])
 async def list_company_users(
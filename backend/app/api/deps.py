@@ -1,35 +1,90 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from ..core.config import settings
-from ..models.user import User
+from ..core.security import create_access_token, create_refresh_token, new_token_id
+from ..core.singleflight import SingleFlight
+from ..models.user import User, USER_CACHE_SCOPE
 from ..models.role import Role
-from ..services.cache import permission_cache
+from ..models.token import RefreshToken
+from ..services.cache import user_cache
+from ..services.permission_cache import permission_cache, LoadToken
+from ..services.permission_index import permission_index
+from ..services.permission_versions import permission_versions
 from beanie import PydanticObjectId
 from beanie.operators import In
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, built from the claims AuthMiddleware verified."""
+    user_id: PydanticObjectId
+    email: str
+    active_company_id: Optional[PydanticObjectId]
+
+def get_principal(request: Request, token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Resolves the caller once per request from request.state, with no token
+    decoding or database access. Use it when only ids are needed.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    active_company_id = getattr(request.state, "active_company_id", None)
+    principal = Principal(
+        user_id=PydanticObjectId(user_id),
+        email=request.state.user_email,
+        active_company_id=PydanticObjectId(active_company_id) if active_company_id else None
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    user = await User.find_one(User.email == email)
+    request.state.principal = principal
+    return principal
+
+# Concurrent cache misses for the same key share one database load
+user_loads = SingleFlight()
+permission_loads = SingleFlight()
+
+async def _fetch_user(user_id: PydanticObjectId) -> Optional[User]:
+    user = await User.get(user_id)
+    if user is not None:
+        user_cache.set(USER_CACHE_SCOPE, "User", user)
+    return user
+
+async def load_user(user_id: PydanticObjectId) -> Optional[User]:
+    """
+    User by _id through the short-TTL user_cache. Returns a copy, so callers
+    may modify and save it without touching the cached instance.
+    """
+    user = user_cache.get(USER_CACHE_SCOPE, "User", user_id)
+    if user is None:
+        user = await user_loads.do(user_id, lambda: _fetch_user(user_id))
+        if user is None:
+            return None
+    return user.model_copy(deep=True)
+
+async def get_current_user(principal: Principal = Depends(get_principal)) -> User:
+    """The full User document, for endpoints that read or modify more than ids."""
+    user = await load_user(principal.user_id)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
-async def get_my_permissions(request: Request) -> set[str]:
+async def get_my_permission_mask(request: Request) -> int:
+    """The caller's permissions in the active company as a PermissionIndex bitmask."""
     user_id = getattr(request.state, "user_id", None)
     active_company_id = getattr(request.state, "active_company_id", None)
 
@@ -40,40 +95,117 @@ async def get_my_permissions(request: Request) -> set[str]:
         )
 
     if not active_company_id:
-        return set()
-
-    # 1. Try fetching from cache
-    user_permissions = permission_cache.get_permissions(user_id, active_company_id)
-
-    if user_permissions is None:
-        # 2. Cache miss - fetch from MongoDB
-        user = await User.get(PydanticObjectId(user_id))
-        if not user:
-            return set()
-
-        roles = await Role.find(
-            In(Role.id, user.role_ids),
-            Role.company_id == PydanticObjectId(active_company_id)
-        ).to_list()
-
-        user_permissions = set()
-        for role in roles:
-            user_permissions.update(role.permission_keys)
-        
-        # 3. Populate cache
-        permission_cache.set_permissions(user_id, active_company_id, user_permissions)
-    
-    return user_permissions
+        return 0
+
+    # 1. Trust the token's claim while the company's permissions haven't changed since it was minted
+    claim = getattr(request.state, "permission_claim", None)
+    if claim is not None and claim[1] == await permission_versions.current(active_company_id):
+        return claim[0]
+
+    return await resolve_permission_mask(user_id, active_company_id)
+
+async def resolve_permission_mask(user_id: str, active_company_id: str) -> int:
+    """The user's permission mask in a company, through the permission cache."""
+    # 2. Try fetching from cache
+    mask, load_token = await permission_cache.lookup(user_id, active_company_id)
+
+    if mask is None:
+        # 3. Cache miss - one load per (user, company) however many requests missed.
+        # The token is part of the key, so misses after an invalidation start a fresh load.
+        mask = await permission_loads.do(
+            (user_id, active_company_id, load_token),
+            lambda: _load_permission_mask(user_id, active_company_id, load_token)
+        )
+
+    return mask
+
+async def _load_permission_mask(user_id: str, active_company_id: str, load_token: LoadToken) -> int:
+    mask = await _read_permission_mask(user_id, active_company_id)
+
+    # 4. Populate cache
+    await permission_cache.store(user_id, active_company_id, mask, load_token)
+    return mask
+
+async def _read_permission_mask(user_id: str, active_company_id: str) -> int:
+    """The user's permission mask in a company, computed from MongoDB with no cache involved."""
+    # role_ids straight from MongoDB: user_cache may hold another worker's pre-change copy,
+    # and a mask built from it would be stored (and put into tokens) under the new version
+    user = await User.get_motor_collection().find_one(
+        {"_id": PydanticObjectId(user_id)}, {"role_ids": 1}
+    )
+    if not user:
+        return 0
+
+    roles = await Role.find(
+        In(Role.id, user.get("role_ids", [])),
+        Role.company_id == PydanticObjectId(active_company_id)
+    ).to_list()
+
+    # Keys seeded since the catalog was last loaded need their bits first
+    await permission_index.ensure(key for role in roles for key in role.permission_keys)
+    mask = 0
+    for role in roles:
+        mask |= permission_index.mask_of(role.permission_keys)
+    return mask
+
+async def access_token_claims(user: User) -> dict:
+    """
+    Claims for a new access token: ids plus, with an active company, the
+    user's permission mask (hex) and the company's permission version.
+    """
+    claims = {
+        "user_id": str(user.id),
+        "active_company_id": str(user.active_company_id) if user.active_company_id else None
+    }
+    if user.active_company_id:
+        # Read the version before the mask: a change in between leaves the claim already stale.
+        # The mask comes from MongoDB, not the cache: roles.py bumps the version before it
+        # invalidates caches, so a cached mask could be the pre-change one under the new version
+        version = await permission_versions.current(user.active_company_id)
+        mask = await _read_permission_mask(str(user.id), str(user.active_company_id))
+        claims.update(perm=format(mask, "x"), pv=version)
+    return claims
+
+async def issue_tokens(user: User, family: Optional[str] = None) -> dict:
+    """
+    A new access/refresh token pair. The refresh token is recorded for
+    rotation; pass the family of the refresh token being rotated to keep the
+    session, or None to start a new one.
+    """
+    family = family or new_token_id()
+    refresh_id = new_token_id()
+    await RefreshToken(
+        jti=refresh_id, family=family, user_id=user.id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ).insert()
+
+    extra_claims = await access_token_claims(user)
+    extra_claims["fam"] = family
+    return {
+        "access_token": create_access_token(user.email, extra_claims=extra_claims),
+        "refresh_token": create_refresh_token(user.email, token_id=refresh_id, family=family),
+        "token_type": "bearer"
+    }
+
+async def get_my_permissions(mask: int = Depends(get_my_permission_mask)) -> set[str]:
+    return permission_index.keys_of(mask)
 
 class PermissionChecker:
     def __init__(self, required_permission: str):
         self.required_permission = required_permission
+        # Resolved on first use and kept: bits are never reassigned
+        self._flag = 0
 
     async def __call__(self, request: Request):
-        user_permissions = await get_my_permissions(request)
+        mask = await get_my_permission_mask(request)
+
+        flag = self._flag
+        if not flag:
+            # Unknown keys stay 0 (and are retried) until the catalog has them
+            flag = self._flag = await permission_index.resolve(self.required_permission)
 
         # Check required permission
-        if self.required_permission not in user_permissions:
+        if not flag or mask & flag != flag:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Missing required permission: {self.required_permission}"
@@ -1,41 +1,73 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime
 from beanie import PydanticObjectId
-from ..models.user import User
-from ..models.sales import Invoice, InvoiceStatus
-from ..schemas.sales import InvoiceCreate, InvoiceRead
+from ..schemas.sales import SalesItemRead, InvoiceCreate, InvoiceRead, InvoiceSummary, InvoiceBulkCreate, BulkCreateResponse
 from ..services.sales_service import sales_service
+from ..services.export_service import export_service, schema_columns
 from ..repositories.sales_repos import invoice_repo
-from ..api.deps import get_current_user
+from ..api.deps import Principal, get_principal
+from ..api.pagination import PageParams, set_page_headers
+from ..api.responses import RawJSONResponse
 
 router = APIRouter()
 
 @router.post("/", response_model=InvoiceRead)
 async def create_invoice(
     inv_in: InvoiceCreate,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    if not current_user.active_company_id:
+    if not principal.active_company_id:
         raise HTTPException(status_code=400, detail="No active company")
-    return await sales_service.create_invoice(inv_in, current_user.active_company_id)
+    return await sales_service.create_invoice(inv_in, principal.active_company_id)
 
-@router.get("/", response_model=List[InvoiceRead])
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def bulk_create_invoices(
+    bulk_in: InvoiceBulkCreate,
+    principal: Principal = Depends(get_principal)
+):
+    if not principal.active_company_id:
+        raise HTTPException(status_code=400, detail="No active company")
+    return await sales_service.bulk_create_invoices(bulk_in.documents, principal.active_company_id)
+
+@router.get("/", response_model=List[InvoiceSummary])
 async def list_invoices(
-    current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    page_params: PageParams = Depends(),
+    principal: Principal = Depends(get_principal)
+):
+    page = await invoice_repo.list_page(projection=InvoiceSummary, raw=True, **page_params.as_kwargs())
+    response = RawJSONResponse(page.items)
+    set_page_headers(response, page)
+    return response
+
+@router.get("/export")
+async def export_invoices(
+    format: Literal["csv", "ndjson"] = "csv",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+    flatten_items: bool = False,
+    principal: Principal = Depends(get_principal)
 ):
-    return await invoice_repo.list(skip=skip, limit=limit)
+    """
+    Streams every matching document. With flatten_items each line item
+    becomes its own row; otherwise CSV leaves line items out and NDJSON nests them.
+    """
+    query = export_service.build_query(invoice_repo, created_from=created_from, created_to=created_to, status=status)
+    return export_service.export(
+        invoice_repo, query, format,
+        columns=schema_columns(InvoiceRead, exclude=("items",)),
+        filename="invoices",
+        item_columns=schema_columns(SalesItemRead),
+        flatten_items=flatten_items
+    )
 
 @router.post("/{id}/issue", response_model=InvoiceRead)
 async def issue_invoice(
     id: PydanticObjectId,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    invoice = await invoice_repo.get(id)
+    invoice = await sales_service.issue_invoice(id, principal.active_company_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    
-    invoice.status = InvoiceStatus.ISSUED
-    await invoice.save()
     return invoice
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Body, Depends, Query, UploadFile, File
+from fastapi.responses import PlainTextResponse
+from typing import List, Literal, Optional
+from datetime import datetime
 from beanie import PydanticObjectId
 from ..schemas.item import ItemCreate, ItemUpdate, ItemOut
 from ..repositories.master_repos import item_repo
 from ..services.master_service import master_service
+from ..services.import_service import import_service
+from ..services.export_service import export_service, schema_columns
 from ..api.deps import PermissionChecker
+from ..api.pagination import PageParams, set_page_headers
+from ..api.responses import RawJSONResponse
+from ..schemas.bulk import BulkIds, BulkActionResult, MAX_BULK_IDS
+from ..schemas.imports import ImportResult
 
 router = APIRouter()
 
@@ -12,22 +20,61 @@ router = APIRouter()
 async def create_item(data: ItemCreate):
     return await master_service.create_item(data)
 
+@router.post("/import", response_model=ImportResult, dependencies=[Depends(PermissionChecker("items.create"))])
+async def import_items(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults from the file extension"),
+    report: Literal["json", "csv"] = "json"
+):
+    result = await import_service.import_rows(file, format, item_repo, ItemCreate, prepare=master_service.apply_item_rules)
+    if report == "csv":
+        return PlainTextResponse(
+            import_service.error_report_csv(result),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=items-import-errors.csv"}
+        )
+    return result
+
 @router.get("/", response_model=List[ItemOut], dependencies=[Depends(PermissionChecker("items.view"))])
 async def list_items(
-    skip: int = 0, 
-    limit: int = 100, 
+    page_params: PageParams = Depends(),
     search: str = Query(None),
+    search_mode: Literal["prefix", "contains"] = "prefix",
     item_type: str = Query(None),
     include_inactive: bool = False
 ):
-    query = item_repo.query()
-    if not include_inactive:
-        query = query.find(item_repo.model.is_active == True)
+    filters = {}
     if search:
-        query = query.find({"name": {"$regex": search, "$options": "i"}})
+        filters.update(item_repo.search_filter(search, contains=search_mode == "contains"))
     if item_type:
-        query = query.find(item_repo.model.item_type == item_type)
-    return await query.skip(skip).limit(limit).to_list()
+        filters["item_type"] = item_type
+    page = await item_repo.list_page(
+        filters, include_inactive, projection=ItemOut, raw=True, **page_params.as_kwargs()
+    )
+    response = RawJSONResponse(page.items)
+    set_page_headers(response, page)
+    return response
+
+@router.get("/export", dependencies=[Depends(PermissionChecker("items.view"))])
+async def export_items(
+    format: Literal["csv", "ndjson"] = "csv",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_inactive: bool = False
+):
+    query = export_service.build_query(item_repo, include_inactive, created_from, created_to)
+    return export_service.export(item_repo, query, format, schema_columns(ItemOut), "items")
+
+@router.patch("/bulk", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("items.edit"))])
+async def bulk_update_items(
+    ids: List[PydanticObjectId] = Body(..., min_length=1, max_length=MAX_BULK_IDS),
+    data: ItemUpdate = Body(...)
+):
+    return BulkActionResult(matched=await master_service.update_items(ids, data))
+
+@router.post("/bulk-deactivate", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("items.delete"))])
+async def bulk_deactivate_items(data: BulkIds):
+    return BulkActionResult(matched=await item_repo.deactivate_many(data.ids))
 
 @router.get("/{id}", response_model=ItemOut, dependencies=[Depends(PermissionChecker("items.view"))])
 async def get_item(id: PydanticObjectId):
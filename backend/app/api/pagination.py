@@ -0,0 +1,55 @@
+import json
+from typing import Any, Dict, Literal, Optional
+from fastapi import Query, Response
+from pymongo import ASCENDING, DESCENDING
+from ..repositories.base import Page
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+FACET_COUNTS_HEADER = "X-Facet-Counts"
+COUNT_ESTIMATED_HEADER = "X-Count-Estimated"
+PAGE_HEADERS = [NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, FACET_COUNTS_HEADER, COUNT_ESTIMATED_HEADER]
+
+class PageParams:
+    """
+    Shared pagination query parameters for list endpoints.
+    Pass the X-Next-Cursor header of one page as `cursor` to fetch the next;
+    `skip` remains available as a fallback when no cursor is given.
+    With `with_counts` the response also carries X-Total-Count and, where the
+    collection has facets, X-Facet-Counts as a JSON object of per-value counts.
+    """
+    def __init__(
+        self,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page"),
+        sort_by: str = Query("_id"),
+        sort_order: Literal["asc", "desc"] = Query("asc"),
+        with_counts: bool = Query(False, description="Return total and facet counts in headers"),
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.sort_by = sort_by
+        self.sort_order = ASCENDING if sort_order == "asc" else DESCENDING
+        self.with_counts = with_counts
+
+    def as_kwargs(self) -> Dict[str, Any]:
+        return {
+            "skip": self.skip,
+            "limit": self.limit,
+            "cursor": self.cursor,
+            "sort_by": self.sort_by,
+            "sort_order": self.sort_order,
+            "with_counts": self.with_counts,
+        }
+
+def set_page_headers(response: Response, page: Page):
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(page.total)
+        if page.facets:
+            response.headers[FACET_COUNTS_HEADER] = json.dumps(page.facets, separators=(",", ":"))
+        if page.counts_estimated:
+            response.headers[COUNT_ESTIMATED_HEADER] = "true"
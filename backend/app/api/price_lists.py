@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Body, Depends, Query, Response
 from typing import List
 from beanie import PydanticObjectId
 from ..schemas.price_list import PriceListCreate, PriceListUpdate, PriceListOut
 from ..repositories.master_repos import price_list_repo
 from ..api.deps import PermissionChecker
+from ..api.pagination import PageParams, set_page_headers
+from ..schemas.bulk import BulkIds, BulkActionResult, MAX_BULK_IDS
 
 router = APIRouter()
 
@@ -12,8 +14,25 @@ async def create_price_list(data: PriceListCreate):
     return await price_list_repo.create(data)
 
 @router.get("/", response_model=List[PriceListOut], dependencies=[Depends(PermissionChecker("price_lists.view"))])
-async def list_price_lists(include_inactive: bool = False):
-    return await price_list_repo.list(include_inactive=include_inactive)
+async def list_price_lists(
+    response: Response,
+    page_params: PageParams = Depends(),
+    include_inactive: bool = False
+):
+    page = await price_list_repo.list_page(include_inactive=include_inactive, **page_params.as_kwargs())
+    set_page_headers(response, page)
+    return page.items
+
+@router.patch("/bulk", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("price_lists.edit"))])
+async def bulk_update_price_lists(
+    ids: List[PydanticObjectId] = Body(..., min_length=1, max_length=MAX_BULK_IDS),
+    data: PriceListUpdate = Body(...)
+):
+    return BulkActionResult(matched=await price_list_repo.update_many_by_ids(ids, data))
+
+@router.post("/bulk-deactivate", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("price_lists.delete"))])
+async def bulk_deactivate_price_lists(data: BulkIds):
+    return BulkActionResult(matched=await price_list_repo.deactivate_many(data.ids))
 
 @router.get("/{id}", response_model=PriceListOut, dependencies=[Depends(PermissionChecker("price_lists.view"))])
 async def get_price_list(id: PydanticObjectId):
@@ -1,36 +1,71 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime
 from beanie import PydanticObjectId
-from ..models.user import User
-from ..models.sales import Quotation, QuotationStatus
-from ..schemas.sales import QuotationCreate, QuotationRead
+from ..schemas.sales import SalesItemRead, QuotationCreate, QuotationRead, QuotationSummary, QuotationBulkCreate, BulkCreateResponse
 from ..services.sales_service import sales_service
+from ..services.export_service import export_service, schema_columns
 from ..repositories.sales_repos import quotation_repo
-from ..api.deps import get_current_user
+from ..api.deps import Principal, get_principal
+from ..api.pagination import PageParams, set_page_headers
+from ..api.responses import RawJSONResponse
 
 router = APIRouter()
 
 @router.post("/", response_model=QuotationRead)
 async def create_quotation(
     q_in: QuotationCreate,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    if not current_user.active_company_id:
+    if not principal.active_company_id:
         raise HTTPException(status_code=400, detail="No active company")
-    return await sales_service.create_quotation(q_in, current_user.active_company_id)
+    return await sales_service.create_quotation(q_in, principal.active_company_id)
 
-@router.get("/", response_model=List[QuotationRead])
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def bulk_create_quotations(
+    bulk_in: QuotationBulkCreate,
+    principal: Principal = Depends(get_principal)
+):
+    if not principal.active_company_id:
+        raise HTTPException(status_code=400, detail="No active company")
+    return await sales_service.bulk_create_quotations(bulk_in.documents, principal.active_company_id)
+
+@router.get("/", response_model=List[QuotationSummary])
 async def list_quotations(
-    current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    page_params: PageParams = Depends(),
+    principal: Principal = Depends(get_principal)
 ):
-    return await quotation_repo.list(skip=skip, limit=limit)
+    page = await quotation_repo.list_page(projection=QuotationSummary, raw=True, **page_params.as_kwargs())
+    response = RawJSONResponse(page.items)
+    set_page_headers(response, page)
+    return response
+
+@router.get("/export")
+async def export_quotations(
+    format: Literal["csv", "ndjson"] = "csv",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+    flatten_items: bool = False,
+    principal: Principal = Depends(get_principal)
+):
+    """
+    Streams every matching document. With flatten_items each line item
+    becomes its own row; otherwise CSV leaves line items out and NDJSON nests them.
+    """
+    query = export_service.build_query(quotation_repo, created_from=created_from, created_to=created_to, status=status)
+    return export_service.export(
+        quotation_repo, query, format,
+        columns=schema_columns(QuotationRead, exclude=("items",)),
+        filename="quotations",
+        item_columns=schema_columns(SalesItemRead),
+        flatten_items=flatten_items
+    )
 
 @router.get("/{id}", response_model=QuotationRead)
 async def get_quotation(
     id: PydanticObjectId,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     quotation = await quotation_repo.get(id)
     if not quotation:
@@ -40,12 +75,9 @@ async def get_quotation(
 @router.post("/{id}/accept", response_model=QuotationRead)
 async def accept_quotation(
     id: PydanticObjectId,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    quotation = await quotation_repo.get(id)
+    quotation = await sales_service.accept_quotation(id, principal.active_company_id)
     if not quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
-    
-    quotation.status = QuotationStatus.ACCEPTED
-    await quotation.save()
     return quotation
@@ -0,0 +1,20 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+from ..core.serialization import json_default
+
+class ORJSONResponse(JSONResponse):
+    """
+    Default response class. orjson serializes datetimes natively (same ISO
+    format as pydantic) and falls back to json_default for ObjectId.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+class RawJSONResponse(ORJSONResponse):
+    """
+    Serializes raw Mongo documents (ObjectId, datetime) directly. Returning it
+    from an endpoint skips FastAPI's response_model validation, so the content
+    must already be in the output shape (see BaseRepository.list_page(raw=True)).
+    """
@@ -5,7 +5,9 @@ from beanie.operators import In
 from ..models.role import Role
 from ..schemas.role import RoleCreate, RoleUpdate, RoleRead, UserRoleAssignment
 from ..models.user import User
-from ..services.cache import permission_cache
+from ..services.permission_cache import permission_cache
+from ..services.permission_versions import permission_versions
+from ..services.dashboard_service import dashboard_service
 # Assuming an auth dependency exists or will be used. 
 # For now, we will require company_id to be passed or inferred.
 
@@ -27,6 +29,7 @@ async def create_role(role_in: RoleCreate, company_id: PydanticObjectId):
         is_system=False
     )
     await role.insert()
+    dashboard_service.invalidate(company_id)
     return role
 
 @router.get("/", response_model=List[RoleRead])
@@ -65,7 +68,8 @@ async def update_role(role_id: PydanticObjectId, role_in: RoleUpdate, company_id
     await role.save()
     
     # Invalidate all users in this company since a role changed
-    permission_cache.invalidate_all_for_company(str(company_id))
+    await permission_versions.bump(company_id)
+    await permission_cache.invalidate_all_for_company(str(company_id))
     
     return role
 
@@ -82,6 +86,11 @@ async def delete_role(role_id: PydanticObjectId, company_id: PydanticObjectId):
         raise HTTPException(status_code=403, detail="System protected roles cannot be deleted")
     
     await role.delete()
+    dashboard_service.invalidate(company_id)
+
+    # Users holding the role lose its permissions
+    await permission_versions.bump(company_id)
+    await permission_cache.invalidate_all_for_company(str(company_id))
     return {"message": "Role deleted successfully"}
 
 @router.post("/assign", response_model=dict)
@@ -105,7 +114,8 @@ async def assign_role(assignment: UserRoleAssignment, company_id: PydanticObject
         await user.save()
         
         # Invalidate cache for this user in this company
-        permission_cache.invalidate(str(assignment.user_id), str(company_id))
+        await permission_versions.bump(company_id)
+        await permission_cache.invalidate(str(assignment.user_id), str(company_id))
         
         return {"message": f"Role '{role.name}' assigned to user"}
     
@@ -130,7 +140,8 @@ async def revoke_role(assignment: UserRoleAssignment, company_id: PydanticObject
         await user.save()
         
         # Invalidate cache for this user in this company
-        permission_cache.invalidate(str(assignment.user_id), str(company_id))
+        await permission_versions.bump(company_id)
+        await permission_cache.invalidate(str(assignment.user_id), str(company_id))
         
         return {"message": f"Role '{role.name}' revoked from user"}
     
@@ -1,36 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime
 from beanie import PydanticObjectId
-from ..models.user import User
 from ..models.sales import SalesOrder, SalesOrderStatus
-from ..schemas.sales import SalesOrderCreate, SalesOrderRead
+from ..schemas.sales import SalesItemRead, SalesOrderCreate, SalesOrderRead, SalesOrderSummary, SalesOrderBulkCreate, BulkCreateResponse
 from ..services.sales_service import sales_service
+from ..services.export_service import export_service, schema_columns
 from ..repositories.sales_repos import sales_order_repo
-from ..api.deps import get_current_user
+from ..api.deps import Principal, get_principal
+from ..api.pagination import PageParams, set_page_headers
+from ..api.responses import RawJSONResponse
 
 router = APIRouter()
 
 @router.post("/", response_model=SalesOrderRead)
 async def create_sales_order(
     so_in: SalesOrderCreate,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    if not current_user.active_company_id:
+    if not principal.active_company_id:
         raise HTTPException(status_code=400, detail="No active company")
-    return await sales_service.create_sales_order(so_in, current_user.active_company_id)
+    return await sales_service.create_sales_order(so_in, principal.active_company_id)
 
-@router.get("/", response_model=List[SalesOrderRead])
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def bulk_create_sales_orders(
+    bulk_in: SalesOrderBulkCreate,
+    principal: Principal = Depends(get_principal)
+):
+    if not principal.active_company_id:
+        raise HTTPException(status_code=400, detail="No active company")
+    return await sales_service.bulk_create_sales_orders(bulk_in.documents, principal.active_company_id)
+
+@router.get("/", response_model=List[SalesOrderSummary])
 async def list_sales_orders(
-    current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    page_params: PageParams = Depends(),
+    principal: Principal = Depends(get_principal)
+):
+    page = await sales_order_repo.list_page(projection=SalesOrderSummary, raw=True, **page_params.as_kwargs())
+    response = RawJSONResponse(page.items)
+    set_page_headers(response, page)
+    return response
+
+@router.get("/export")
+async def export_sales_orders(
+    format: Literal["csv", "ndjson"] = "csv",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+    flatten_items: bool = False,
+    principal: Principal = Depends(get_principal)
 ):
-    return await sales_order_repo.list(skip=skip, limit=limit)
+    """
+    Streams every matching document. With flatten_items each line item
+    becomes its own row; otherwise CSV leaves line items out and NDJSON nests them.
+    """
+    query = export_service.build_query(sales_order_repo, created_from=created_from, created_to=created_to, status=status)
+    return export_service.export(
+        sales_order_repo, query, format,
+        columns=schema_columns(SalesOrderRead, exclude=("items",)),
+        filename="sales-orders",
+        item_columns=schema_columns(SalesItemRead),
+        flatten_items=flatten_items
+    )
 
 @router.post("/{id}/confirm", response_model=SalesOrderRead)
 async def confirm_sales_order(
     id: PydanticObjectId,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     order = await sales_order_repo.get(id)
     if not order:
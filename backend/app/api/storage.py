@@ -1,7 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from ..services.storage import storage_service
-from ..api.deps import get_current_user
-from ..models.user import User
+from ..api.deps import Principal, get_principal
 
 router = APIRouter()
 
@@ -9,7 +8,7 @@ router = APIRouter()
 async def upload_file(
     file: UploadFile = File(...),
     folder: str = "general",
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     """
     Upload a file to Supabase Storage and return the path and a temporary signed URL.
@@ -17,7 +16,7 @@ async def upload_file(
     """
     # Use tenant isolation for folders if possible
     # We can prefix the folder with company_id
-    company_prefix = str(current_user.active_company_id) if current_user.active_company_id else "public"
+    company_prefix = str(principal.active_company_id) if principal.active_company_id else "public"
     tenant_folder = f"{company_prefix}/{folder}"
     
     path, filename = await storage_service.upload_file(file, folder=tenant_folder)
@@ -32,13 +31,13 @@ async def upload_file(
 @router.get("/signed-url")
 def get_signed_url(
     path: str,
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     """
     Generate a new signed URL for an existing file.
     """
     # Security check: Ensure the path belongs to the user's company
-    company_prefix = str(current_user.active_company_id) if current_user.active_company_id else "public"
+    company_prefix = str(principal.active_company_id) if principal.active_company_id else "public"
     if not path.startswith(company_prefix):
          raise HTTPException(status_code=403, detail="Access denied to this file")
          
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Body, Depends, Query, Response
 from typing import List
 from beanie import PydanticObjectId
 from ..schemas.tax import TaxCreate, TaxUpdate, TaxOut
 from ..repositories.master_repos import tax_repo
 from ..api.deps import PermissionChecker
+from ..api.pagination import PageParams, set_page_headers
+from ..schemas.bulk import BulkIds, BulkActionResult, MAX_BULK_IDS
 
 router = APIRouter()
 
@@ -12,8 +14,25 @@ async def create_tax(data: TaxCreate):
     return await tax_repo.create(data)
 
 @router.get("/", response_model=List[TaxOut], dependencies=[Depends(PermissionChecker("taxes.view"))])
-async def list_taxes(include_inactive: bool = False):
-    return await tax_repo.list(include_inactive=include_inactive)
+async def list_taxes(
+    response: Response,
+    page_params: PageParams = Depends(),
+    include_inactive: bool = False
+):
+    page = await tax_repo.list_page(include_inactive=include_inactive, **page_params.as_kwargs())
+    set_page_headers(response, page)
+    return page.items
+
+@router.patch("/bulk", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("taxes.edit"))])
+async def bulk_update_taxes(
+    ids: List[PydanticObjectId] = Body(..., min_length=1, max_length=MAX_BULK_IDS),
+    data: TaxUpdate = Body(...)
+):
+    return BulkActionResult(matched=await tax_repo.update_many_by_ids(ids, data))
+
+@router.post("/bulk-deactivate", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("taxes.delete"))])
+async def bulk_deactivate_taxes(data: BulkIds):
+    return BulkActionResult(matched=await tax_repo.deactivate_many(data.ids))
 
 @router.patch("/{id}", response_model=TaxOut, dependencies=[Depends(PermissionChecker("taxes.edit"))])
 async def update_tax(id: PydanticObjectId, data: TaxUpdate):
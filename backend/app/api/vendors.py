@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Body, Depends, Query, UploadFile, File
+from fastapi.responses import PlainTextResponse
+from typing import List, Literal, Optional
+from datetime import datetime
 from beanie import PydanticObjectId
 from ..schemas.vendor import VendorCreate, VendorUpdate, VendorOut
 from ..repositories.master_repos import vendor_repo
 from ..services.master_service import master_service
+from ..services.import_service import import_service
+from ..services.export_service import export_service, schema_columns
 from ..api.deps import PermissionChecker
+from ..api.pagination import PageParams, set_page_headers
+from ..api.responses import RawJSONResponse
+from ..schemas.bulk import BulkIds, BulkActionResult, MAX_BULK_IDS
+from ..schemas.imports import ImportResult
 
 router = APIRouter()
 
@@ -12,19 +20,58 @@ router = APIRouter()
 async def create_vendor(data: VendorCreate):
     return await master_service.create_vendor(data)
 
+@router.post("/import", response_model=ImportResult, dependencies=[Depends(PermissionChecker("vendors.create"))])
+async def import_vendors(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults from the file extension"),
+    report: Literal["json", "csv"] = "json"
+):
+    result = await import_service.import_rows(file, format, vendor_repo, VendorCreate)
+    if report == "csv":
+        return PlainTextResponse(
+            import_service.error_report_csv(result),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=vendors-import-errors.csv"}
+        )
+    return result
+
 @router.get("/", response_model=List[VendorOut], dependencies=[Depends(PermissionChecker("vendors.view"))])
 async def list_vendors(
-    skip: int = 0, 
-    limit: int = 100, 
+    page_params: PageParams = Depends(),
     search: str = Query(None),
+    search_mode: Literal["prefix", "contains"] = "prefix",
     include_inactive: bool = False
 ):
-    query = vendor_repo.query()
-    if not include_inactive:
-        query = query.find(vendor_repo.model.is_active == True)
+    filters = {}
     if search:
-        query = query.find({"name": {"$regex": search, "$options": "i"}})
-    return await query.skip(skip).limit(limit).to_list()
+        filters.update(vendor_repo.search_filter(search, contains=search_mode == "contains"))
+    page = await vendor_repo.list_page(
+        filters, include_inactive, projection=VendorOut, raw=True, **page_params.as_kwargs()
+    )
+    response = RawJSONResponse(page.items)
+    set_page_headers(response, page)
+    return response
+
+@router.get("/export", dependencies=[Depends(PermissionChecker("vendors.view"))])
+async def export_vendors(
+    format: Literal["csv", "ndjson"] = "csv",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_inactive: bool = False
+):
+    query = export_service.build_query(vendor_repo, include_inactive, created_from, created_to)
+    return export_service.export(vendor_repo, query, format, schema_columns(VendorOut), "vendors")
+
+@router.patch("/bulk", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("vendors.edit"))])
+async def bulk_update_vendors(
+    ids: List[PydanticObjectId] = Body(..., min_length=1, max_length=MAX_BULK_IDS),
+    data: VendorUpdate = Body(...)
+):
+    return BulkActionResult(matched=await vendor_repo.update_many_by_ids(ids, data))
+
+@router.post("/bulk-deactivate", response_model=BulkActionResult, dependencies=[Depends(PermissionChecker("vendors.delete"))])
+async def bulk_deactivate_vendors(data: BulkIds):
+    return BulkActionResult(matched=await vendor_repo.deactivate_many(data.ids))
 
 @router.get("/{id}", response_model=VendorOut, dependencies=[Depends(PermissionChecker("vendors.view"))])
 async def get_vendor(id: PydanticObjectId):
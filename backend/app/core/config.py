@@ -11,12 +11,65 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # A refresh token presented again this soon after its first use is a client race
+    # (e.g. two tabs), answered with 401 instead of revoking the session
+    REFRESH_REUSE_GRACE_SECONDS: int = 10
+    # bcrypt cost for new hashes; existing hashes are upgraded on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Threads per worker for password hashing and verification
+    PASSWORD_HASH_WORKERS: int = 4
+    # Verified access tokens kept by AuthMiddleware to skip repeat signature checks
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Bloom filter in front of revoked_tokens: sized for this many live revocations
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    # How often revocations from other workers are picked up, and the filter rebuilt
+    REVOCATION_SYNC_SECONDS: int = 5
+    REVOCATION_REBUILD_SECONDS: int = 3600
     
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_BUCKET: str = "erp-uploads"
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024 # 5MB
 
+    PERMISSION_CACHE_MAX_ENTRIES: int = 50000
+    PERMISSION_CACHE_TTL_SECONDS: int = 300
+    # "memory" (single worker) or "redis" (shared L2 + pub/sub invalidation across workers)
+    PERMISSION_CACHE_BACKEND: str = "memory"
+    PERMISSION_CACHE_CHANNEL: str = "permission-invalidations"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Permission versions are re-read after this long, bounding how long a
+    # worker trusts token permission claims after a change it wasn't told about
+    PERMISSION_VERSION_TTL_SECONDS: int = 30
+    # Minimum gap between permission catalog reloads triggered by unknown keys
+    PERMISSION_INDEX_RELOAD_SECONDS: int = 30
+    # How often expired cache entries are purged in the background
+    CACHE_PURGE_INTERVAL_SECONDS: int = 60
+
+    MASTER_CACHE_MAX_ENTRIES: int = 10000
+    # Writes are broadcast over the permission cache backend; with "memory" and several
+    # workers, or when a broadcast fails, other workers may serve a stale master this long
+    MASTER_CACHE_TTL_SECONDS: int = 300
+
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # Dashboard stats per company; role/membership changes on this worker invalidate immediately
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 10000
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+
+    SEQUENCE_LEASE_BLOCK_SIZE: int = 100
+
+    IMPORT_BATCH_SIZE: int = 1000
+
+    # List totals above this are served from count_cache instead of recounted per page
+    COUNT_ESTIMATE_THRESHOLD: int = 50000
+    COUNT_CACHE_MAX_ENTRIES: int = 10000
+    COUNT_CACHE_TTL_SECONDS: int = 60
+
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
@@ -1,70 +1,134 @@
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+import logging
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
 from jose import jwt, JWTError
 from ..core.config import settings
-from ..models.user import User
 from beanie import PydanticObjectId
 from ..core.tenant import set_tenant_id
+from ..services.cache import token_cache
+from ..services.revocation import revocation_list
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Allow preflight (OPTIONS) requests to pass through
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        # Exclude documentation and auth endpoints from middleware
-        # Note: routes are prefixed with /api/v1 in main.py
-        exempt_paths = [
-            "/docs", "/openapi.json", "/redoc", "/",
-            "/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/refresh"
-        ]
-        if request.url.path in exempt_paths:
-            return await call_next(request)
+logger = logging.getLogger(__name__)
+
+# Documentation and auth endpoints don't need a token.
+# Note: routes are prefixed with /api/v1 in main.py
+EXEMPT_PATHS = frozenset({
+    "/docs", "/openapi.json", "/redoc", "/",
+    "/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/refresh"
+})
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verified claims of an access token. Repeat requests with the same token
+    are served from token_cache until the token expires.
+    Raises JWTError (or ExpiredSignatureError) like jwt.decode.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if "perm" in payload:
+            # Parse the hex permission mask once, not on every request
+            payload["perm"] = int(payload["perm"], 16)
+        token_cache.set(token, payload)
+    return payload
+
+class AuthMiddleware:
+    """
+    Pure ASGI middleware: validates the bearer token, puts user_id,
+    active_company_id, user_email and any permission claim on request.state
+    and sets the tenant ContextVar for the rest of the request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Allow preflight (OPTIONS) requests and non-HTTP traffic to pass through
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         try:
-            auth_header = request.headers.get("Authorization")
+            auth_header = self._authorization_header(scope)
             if not auth_header or not auth_header.startswith("Bearer "):
-                return await self._unauthorized_response("Missing or invalid authorization header")
+                await self._unauthorized_response("Missing or invalid authorization header")(scope, receive, send)
+                return
 
             token = auth_header.split(" ")[1]
             try:
-                payload = jwt.decode(
-                    token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-                )
-                email: str = payload.get("sub")
-                user_id: str = payload.get("user_id")
-                active_company_id: str = payload.get("active_company_id")
-                is_refresh: bool = payload.get("refresh", False)
-                
-                if email is None or user_id is None or is_refresh:
-                    return await self._unauthorized_response("Invalid token payload")
-
-                # Inject into request state and context
-                request.state.user_id = user_id
-                request.state.active_company_id = active_company_id
-                request.state.user_email = email
-                
-                if active_company_id:
-                    set_tenant_id(PydanticObjectId(active_company_id))
-                    
+                payload = decode_access_token(token)
             except jwt.ExpiredSignatureError:
-                return await self._unauthorized_response("Token has expired")
+                await self._unauthorized_response("Token has expired")(scope, receive, send)
+                return
             except JWTError:
-                return await self._unauthorized_response("Could not validate credentials")
-
-            return await call_next(request)
-        except Exception as e:
-            import traceback
-            print(f"ERROR IN AUTH MIDDLEWARE: {e}")
-            traceback.print_exc()
-            from fastapi.responses import JSONResponse
-            return JSONResponse(
-                status_code=500,
-                content={"detail": f"Internal Server Error in Middleware: {str(e)}"}
-            )
-
-    async def _unauthorized_response(self, detail: str):
-        from fastapi.responses import JSONResponse
+                await self._unauthorized_response("Could not validate credentials")(scope, receive, send)
+                return
+
+            email: str = payload.get("sub")
+            user_id: str = payload.get("user_id")
+            active_company_id: str = payload.get("active_company_id")
+            is_refresh: bool = payload.get("refresh", False)
+
+            if email is None or user_id is None or is_refresh:
+                await self._unauthorized_response("Invalid token payload")(scope, receive, send)
+                return
+
+            token_id = payload.get("jti")
+            family = payload.get("fam")
+            # Bloom filter check; MongoDB is only consulted for the rare possible match
+            if (token_id or family) and await revocation_list.is_revoked(token_id, family):
+                await self._unauthorized_response("Token has been revoked")(scope, receive, send)
+                return
+
+            # Inject into request state (Starlette's request.state reads scope["state"]) and context
+            state = scope.setdefault("state", {})
+            state["user_id"] = user_id
+            state["active_company_id"] = active_company_id
+            state["user_email"] = email
+            state["token_id"] = token_id
+            state["token_family"] = family
+            if "perm" in payload and "pv" in payload:
+                state["permission_claim"] = (payload["perm"], payload["pv"])
+
+            if active_company_id:
+                set_tenant_id(PydanticObjectId(active_company_id))
+        except Exception:
+            await self._error_response()(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            # Once headers are out the error can't be turned into a response
+            if response_started:
+                raise
+            await self._error_response()(scope, receive, send)
+
+    @staticmethod
+    def _authorization_header(scope: Scope):
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                return value.decode("latin-1")
+        return None
+
+    def _error_response(self) -> JSONResponse:
+        """500 for the exception being handled; details go to the log, not the client."""
+        logger.exception("Unhandled error in auth middleware")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": "Internal Server Error"}
+        )
+
+    def _unauthorized_response(self, detail: str) -> JSONResponse:
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"detail": detail},
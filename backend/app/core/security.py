@@ -1,23 +1,56 @@
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any
 from jose import jwt
 import bcrypt
 from ..core.config import settings
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop; its size caps how many hashes run at once per worker process.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password pool; use this from request handlers."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password pool; use this from request handlers."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
 
-def create_token(subject: Any, expires_delta: timedelta, is_refresh: bool = False, extra_claims: dict[str, Any] = None) -> str:
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when a hash was made with a different cost than BCRYPT_ROUNDS ($2b$<cost>$...)."""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+def create_token(
+    subject: Any, expires_delta: timedelta, is_refresh: bool = False,
+    extra_claims: dict[str, Any] = None, token_id: str = None
+) -> str:
     expire = datetime.utcnow() + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject), "refresh": is_refresh}
+    to_encode = {"exp": expire, "sub": str(subject), "refresh": is_refresh, "jti": token_id or new_token_id()}
     if extra_claims:
         to_encode.update(extra_claims)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def new_token_id() -> str:
+    """Random id for a token (jti) or a refresh token family."""
+    return uuid.uuid4().hex
+
 def create_access_token(subject: Any, extra_claims: dict[str, Any] = None) -> str:
     return create_token(
         subject, 
@@ -25,9 +58,11 @@ def create_access_token(subject: Any, extra_claims: dict[str, Any] = None) -> st
         extra_claims=extra_claims
     )
 
-def create_refresh_token(subject: Any) -> str:
+def create_refresh_token(subject: Any, token_id: str = None, family: str = None) -> str:
     return create_token(
         subject, 
         timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS), 
-        is_refresh=True
+        is_refresh=True,
+        extra_claims={"fam": family} if family else None,
+        token_id=token_id
     )
@@ -0,0 +1,11 @@
+from datetime import date, datetime
+from typing import Any
+from bson import ObjectId
+
+def json_default(value: Any) -> Any:
+    """json.dumps fallback for the BSON types raw Mongo documents contain."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from .core.config import settings
@@ -22,6 +23,7 @@ from .api.quotations import router as quotations_router
 from .api.sales_orders import router as sales_orders_router
 from .api.invoices import router as invoices_router
 from .models.permission import Permission
+from .models.permission_version import PermissionVersion
 from .models.role import Role
 from .models.customer import Customer
 from .models.vendor import Vendor
@@ -31,9 +33,22 @@ from .models.tax import Tax
 from .models.price_list import PriceList
 from .models.sequence import Sequence
 from .models.sales import Quotation, SalesOrder, Invoice, CreditNote
+from .models.token import RevokedToken, RefreshToken
+from .models.company_stats import CompanyStats
 from .core.middleware import AuthMiddleware
+from .services.permission_cache import permission_cache
+from .services.permission_index import permission_index
+from .services.revocation import revocation_list
+from .api.pagination import PAGE_HEADERS
+from .api.responses import ORJSONResponse
 
-app = FastAPI(title=settings.PROJECT_NAME)
+try:
+    # Optional: brotli-asgi negotiates br and falls back to gzip for other clients
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+app = FastAPI(title=settings.PROJECT_NAME, default_response_class=ORJSONResponse)
  
 app.add_middleware(
     CORSMiddleware,
@@ -41,21 +56,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=PAGE_HEADERS,
 )
 
 app.add_middleware(AuthMiddleware)
 
+# Added last so it wraps everything, including error responses from AuthMiddleware
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
 @app.on_event("startup")
 async def startup_event():
     client = AsyncIOMotorClient(settings.MONGODB_URL)
     await init_beanie(
         database=client[settings.DATABASE_NAME],
         document_models=[
-            User, Company, FileMetadata, Permission, Role,
+            User, Company, FileMetadata, Permission, PermissionVersion, Role,
             Customer, Vendor, Item, ItemCategory, Tax, PriceList,
-            Sequence, Quotation, SalesOrder, Invoice, CreditNote
+            Sequence, Quotation, SalesOrder, Invoice, CreditNote,
+            RevokedToken, RefreshToken, CompanyStats
         ]
     )
+    await permission_index.load()
+    permission_cache.start(settings.CACHE_PURGE_INTERVAL_SECONDS)
+    await revocation_list.load()
+    revocation_list.start(settings.REVOCATION_SYNC_SECONDS, settings.REVOCATION_REBUILD_SECONDS)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await permission_cache.stop()
+    revocation_list.stop()
 
 api_router = APIRouter()
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
@@ -1,7 +1,74 @@
 from datetime import datetime
 from beanie import Document, PydanticObjectId
 from pydantic import Field
-from typing import Optional
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from typing import List, Optional
+
+def normalize_name(value: Optional[str]) -> Optional[str]:
+    """Lower-cased, whitespace-collapsed form of a name used for indexed search."""
+    if not value:
+        return None
+    return " ".join(value.split()).lower()
+
+def normalize_code(value: Optional[str]) -> Optional[str]:
+    """Lower-cased form of a code (SKU, GST number) with all whitespace removed."""
+    if not value:
+        return None
+    return "".join(value.split()).lower()
+
+# Partial filter for indexes that only need to cover live (not soft-deleted) documents
+ACTIVE_ONLY = {"is_active": True}
+
+def tenant_indexes(*sort_fields: str) -> List[IndexModel]:
+    """
+    Compound indexes for the standard tenant list query
+    {company_id, is_active: true} ordered by _id or by (field, _id).
+    They are partial on is_active, so soft-deleted documents don't bloat them.
+    """
+    indexes = [
+        IndexModel(
+            [("company_id", ASCENDING), ("_id", ASCENDING)],
+            name="company_id_active",
+            partialFilterExpression=ACTIVE_ONLY
+        )
+    ]
+    for field in sort_fields:
+        indexes.append(IndexModel(
+            [("company_id", ASCENDING), (field, ASCENDING), ("_id", ASCENDING)],
+            name=f"company_{field}_active",
+            partialFilterExpression=ACTIVE_ONLY
+        ))
+    return indexes
+
+def tenant_unique_index(field: str) -> IndexModel:
+    """Uniqueness of `field` within a company (inactive documents included)."""
+    return IndexModel(
+        [("company_id", ASCENDING), (field, ASCENDING)],
+        name=f"company_{field}_unique",
+        unique=True
+    )
+
+def tenant_search_index(field: str, unique: bool = False) -> IndexModel:
+    """
+    Prefix search on a normalized field. Partial on string values so documents
+    without the field stay out of it; search predicates include $type: "string".
+    With unique=True it also enforces per-company uniqueness of the normalized
+    value, which is case- and whitespace-insensitive on the source field.
+    """
+    return IndexModel(
+        [("company_id", ASCENDING), (field, ASCENDING)],
+        name=f"company_{field}_unique" if unique else f"company_{field}",
+        unique=unique,
+        partialFilterExpression={field: {"$type": "string"}}
+    )
+
+def tenant_status_index() -> IndexModel:
+    """Status filters on sales documents, newest first."""
+    return IndexModel(
+        [("company_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)],
+        name="company_status_created_active",
+        partialFilterExpression=ACTIVE_ONLY
+    )
 
 class TenantDocument(Document):
     """
@@ -1,11 +1,18 @@
 from typing import Optional
-from beanie import Indexed, PydanticObjectId
+from beanie import PydanticObjectId
 from pydantic import Field
-from .base import TenantDocument
+from pymongo import IndexModel, ASCENDING
+from .base import TenantDocument, tenant_indexes, tenant_search_index
 
 class ItemCategory(TenantDocument):
-    name: Indexed(str) = Field(..., description="Category name")
+    name: str = Field(..., description="Category name")
     parent_category_id: Optional[PydanticObjectId] = Field(None, description="Parent category if any")
+    name_lower: Optional[str] = Field(None, description="Normalized name for indexed search")
 
     class Settings:
         name = "item_categories"
+        indexes = tenant_indexes("name", "created_at") + [
+            # Name sorts that include inactive documents
+            IndexModel([("company_id", ASCENDING), ("name", ASCENDING)], name="company_name"),
+            tenant_search_index("name_lower", unique=True),
+        ]
@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Dict
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError
+
+class CompanyStats(Document):
+    """
+    Pre-aggregated sales counters per company, kept current with $inc as
+    documents change status so the dashboard never scans sales collections.
+    scripts/rebuild_company_stats.py recomputes them from the documents.
+    """
+    company_id: PydanticObjectId
+    open_quotations: int = Field(default=0, description="Active quotations in DRAFT or SENT")
+    unpaid_invoice_total: float = Field(default=0.0, description="grand_total of active ISSUED/OVERDUE invoices")
+    revenue_by_month: Dict[str, float] = Field(
+        default_factory=dict, description="grand_total of invoices by month issued (YYYY-MM)"
+    )
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "company_stats"
+        indexes = [
+            IndexModel("company_id", unique=True, name="company_unique")
+        ]
+
+def month_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+async def increment_company_stats(company_id: PydanticObjectId, increments: Dict[str, float]):
+    """
+    Atomically applies counter deltas, e.g. {"open_quotations": 1} or
+    {"revenue_by_month.2024-05": 1250.0}. Zero deltas are skipped.
+    """
+    increments = {field: delta for field, delta in increments.items() if delta}
+    if not increments:
+        return
+    collection = CompanyStats.get_motor_collection()
+    query = {"company_id": company_id}
+    update = {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}}
+    try:
+        await collection.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        # Two first-time upserts raced on the unique index; the document exists now
+        await collection.update_one(query, update)
@@ -1,10 +1,11 @@
 from typing import List, Optional
-from beanie import Indexed, PydanticObjectId
+from beanie import PydanticObjectId
 from pydantic import Field
-from .base import TenantDocument
+from pymongo import IndexModel, ASCENDING
+from .base import TenantDocument, tenant_indexes, tenant_search_index, ACTIVE_ONLY
 
 class Item(TenantDocument):
-    name: Indexed(str) = Field(..., description="Item name")
+    name: str = Field(..., description="Item name")
     item_type: str = Field(..., description="PRODUCT / SERVICE")
     category_id: Optional[PydanticObjectId] = Field(None, description="Category reference")
     sku: Optional[str] = Field(None, description="Stock Keeping Unit")
@@ -13,6 +14,18 @@ class Item(TenantDocument):
     purchase_price: float = Field(0.0)
     tax_ids: List[PydanticObjectId] = Field(default_factory=list, description="Associated taxes")
     track_inventory: bool = Field(default=False)
+    name_lower: Optional[str] = Field(None, description="Normalized name for indexed search")
+    sku_normalized: Optional[str] = Field(None, description="Normalized SKU for indexed search")
 
     class Settings:
         name = "items"
+        indexes = tenant_indexes("name", "created_at") + [
+            # Name sorts that include inactive documents
+            IndexModel([("company_id", ASCENDING), ("name", ASCENDING)], name="company_name"),
+            tenant_search_index("name_lower", unique=True),
+            tenant_search_index("sku_normalized", unique=True),
+            IndexModel([("company_id", ASCENDING), ("item_type", ASCENDING), ("_id", ASCENDING)],
+                       name="company_item_type_active", partialFilterExpression=ACTIVE_ONLY),
+            # Category deletion checks for remaining items
+            IndexModel([("company_id", ASCENDING), ("category_id", ASCENDING)], name="company_category"),
+        ]
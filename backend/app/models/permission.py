@@ -1,6 +1,7 @@
 from beanie import Document, Indexed
 from pydantic import Field
 from typing import Optional
+from pymongo import IndexModel
 
 class Permission(Document):
     """
@@ -11,6 +12,10 @@ class Permission(Document):
     module: str = Field(..., description="The module this permission belongs to (e.g., 'inventory')")
     action: str = Field(..., description="The action permitted (e.g., 'create')")
     description: Optional[str] = Field(None, description="Human readable description of the permission")
+    bit: Optional[int] = Field(None, description="Stable bit position in permission masks, assigned at startup")
 
     class Settings:
         name = "permissions"
+        indexes = [
+            IndexModel("bit", name="bit_unique", unique=True, partialFilterExpression={"bit": {"$type": "int"}}),
+        ]
@@ -0,0 +1,42 @@
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+class PermissionVersion(Document):
+    """
+    Per-company counter bumped whenever effective permissions in the company
+    change. Access tokens carry the version they were minted at, so a mismatch
+    means the permission claim in the token may be stale.
+    Kept out of Company so saving a company can never roll the counter back.
+    """
+    company_id: PydanticObjectId
+    version: int = Field(default=0)
+
+    class Settings:
+        name = "permission_versions"
+        indexes = [
+            IndexModel("company_id", unique=True, name="company_unique")
+        ]
+
+async def get_permission_version(company_id: PydanticObjectId) -> int:
+    doc = await PermissionVersion.get_motor_collection().find_one(
+        {"company_id": company_id}, {"version": 1}
+    )
+    return doc["version"] if doc else 0
+
+async def bump_permission_version(company_id: PydanticObjectId) -> int:
+    """Atomically increments the company's version and returns the new value."""
+    collection = PermissionVersion.get_motor_collection()
+    query = {"company_id": company_id}
+    update = {"$inc": {"version": 1}}
+    try:
+        doc = await collection.find_one_and_update(
+            query, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Two first-time upserts raced on the unique index; the counter exists now
+        doc = await collection.find_one_and_update(
+            query, update, return_document=ReturnDocument.AFTER
+        )
+    return doc["version"]
@@ -1,15 +1,20 @@
 from typing import List
-from beanie import Indexed, PydanticObjectId
+from beanie import PydanticObjectId
 from pydantic import BaseModel, Field
-from .base import TenantDocument
+from pymongo import IndexModel, ASCENDING
+from .base import TenantDocument, tenant_indexes
 
 class ItemPrice(BaseModel):
     item_id: PydanticObjectId
     price: float
 
 class PriceList(TenantDocument):
-    name: Indexed(str) = Field(..., description="Price list name")
+    name: str = Field(..., description="Price list name")
     item_prices: List[ItemPrice] = Field(default_factory=list)
 
     class Settings:
         name = "price_lists"
+        indexes = tenant_indexes("name", "created_at") + [
+            # Duplicate-name checks and name sorts that include inactive documents
+            IndexModel([("company_id", ASCENDING), ("name", ASCENDING)], name="company_name"),
+        ]
@@ -1,5 +1,6 @@
 from typing import List
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from .base import TenantDocument
 
 class Role(TenantDocument):
@@ -14,3 +15,6 @@ class Role(TenantDocument):
 
     class Settings:
         name = "roles"
+        indexes = [
+            IndexModel([("company_id", ASCENDING), ("name", ASCENDING)], name="company_name"),
+        ]
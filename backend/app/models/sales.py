@@ -1,8 +1,9 @@
 from typing import List, Optional
 from datetime import datetime, date
-from beanie import PydanticObjectId, Indexed
+from beanie import PydanticObjectId
 from pydantic import Field, BaseModel
-from .base import TenantDocument
+from pymongo import IndexModel, ASCENDING
+from .base import TenantDocument, tenant_indexes, tenant_unique_index, tenant_status_index
 
 class SalesItem(BaseModel):
     item_id: PydanticObjectId
@@ -20,8 +21,11 @@ class QuotationStatus(str):
     ACCEPTED = "ACCEPTED"
     REJECTED = "REJECTED"
 
+# Statuses counted by CompanyStats
+OPEN_QUOTATION_STATUSES = (QuotationStatus.DRAFT, QuotationStatus.SENT)
+
 class Quotation(TenantDocument):
-    quote_number: Indexed(str, unique=True)
+    quote_number: str
     customer_id: PydanticObjectId
     customer_name: str  # Snapshotted
     items: List[SalesItem]
@@ -34,6 +38,10 @@ class Quotation(TenantDocument):
     
     class Settings:
         name = "quotations"
+        indexes = tenant_indexes("quote_number", "created_at", "grand_total") + [
+            tenant_unique_index("quote_number"),
+            tenant_status_index(),
+        ]
 
 class SalesOrderStatus(str):
     DRAFT = "DRAFT"
@@ -41,7 +49,7 @@ class SalesOrderStatus(str):
     CANCELLED = "CANCELLED"
 
 class SalesOrder(TenantDocument):
-    order_number: Indexed(str, unique=True)
+    order_number: str
     customer_id: PydanticObjectId
     customer_name: str
     quotation_id: Optional[PydanticObjectId] = None
@@ -54,6 +62,10 @@ class SalesOrder(TenantDocument):
 
     class Settings:
         name = "sales_orders"
+        indexes = tenant_indexes("order_number", "created_at", "grand_total") + [
+            tenant_unique_index("order_number"),
+            tenant_status_index(),
+        ]
 
 class InvoiceStatus(str):
     DRAFT = "DRAFT"
@@ -62,8 +74,11 @@ class InvoiceStatus(str):
     OVERDUE = "OVERDUE"
     CANCELLED = "CANCELLED"
 
+UNPAID_INVOICE_STATUSES = (InvoiceStatus.ISSUED, InvoiceStatus.OVERDUE)
+BILLED_INVOICE_STATUSES = (InvoiceStatus.ISSUED, InvoiceStatus.OVERDUE, InvoiceStatus.PAID)
+
 class Invoice(TenantDocument):
-    invoice_number: Indexed(str, unique=True)
+    invoice_number: str
     customer_id: PydanticObjectId
     customer_name: str
     sales_order_id: Optional[PydanticObjectId] = None
@@ -73,13 +88,18 @@ class Invoice(TenantDocument):
     grand_total: float
     due_date: Optional[datetime] = None
     status: str = InvoiceStatus.DRAFT
+    issued_at: Optional[datetime] = None
     notes: Optional[str] = None
 
     class Settings:
         name = "invoices"
+        indexes = tenant_indexes("invoice_number", "created_at", "grand_total") + [
+            tenant_unique_index("invoice_number"),
+            tenant_status_index(),
+        ]
 
 class CreditNote(TenantDocument):
-    credit_note_number: Indexed(str, unique=True)
+    credit_note_number: str
     invoice_id: PydanticObjectId
     amount: float
     reason: str
@@ -87,3 +107,7 @@ class CreditNote(TenantDocument):
 
     class Settings:
         name = "credit_notes"
+        indexes = tenant_indexes("credit_note_number", "created_at") + [
+            tenant_unique_index("credit_note_number"),
+            IndexModel([("company_id", ASCENDING), ("invoice_id", ASCENDING)], name="company_invoice"),
+        ]
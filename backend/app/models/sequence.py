@@ -1,6 +1,11 @@
+import asyncio
 from datetime import datetime
+from typing import Dict, Tuple
 from beanie import Document, Indexed, PydanticObjectId
 from pydantic import Field
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from ..core.config import settings
 
 class Sequence(Document):
     """
@@ -16,30 +21,80 @@ class Sequence(Document):
     class Settings:
         name = "sequences"
         indexes = [
-            [("company_id", 1), ("entity", 1)]  # Unique index will be handled by logic or Beanie unique=True
+            IndexModel([("company_id", 1), ("entity", 1)], unique=True, name="company_entity_unique")
         ]
 
-async def get_next_sequence_number(company_id: PydanticObjectId, entity: str, prefix: str) -> str:
+def format_sequence_number(prefix: str, padding: int, value: int) -> str:
+    return f"{prefix}{str(value).zfill(padding)}"
+
+async def reserve_sequence_block(
+    company_id: PydanticObjectId, entity: str, prefix: str, count: int = 1
+) -> Tuple[int, str, int]:
+    """
+    Atomically reserves `count` consecutive values in a single round trip.
+    Returns (first reserved value, prefix, padding) so callers can format the range.
+    """
+    collection = Sequence.get_motor_collection()
+    query = {"company_id": company_id, "entity": entity}
+    update = {
+        "$inc": {"current_value": count},
+        "$setOnInsert": {"prefix": prefix, "padding": Sequence.model_fields["padding"].default},
+    }
+    try:
+        sequence = await collection.find_one_and_update(
+            query, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Two first-time upserts raced on the unique index; the counter exists now
+        sequence = await collection.find_one_and_update(
+            query, update, return_document=ReturnDocument.AFTER
+        )
+
+    first_value = sequence["current_value"] - count + 1
+    return first_value, sequence["prefix"], sequence["padding"]
+
+async def get_next_sequence_number(
+    company_id: PydanticObjectId, entity: str, prefix: str, leased: bool = False
+) -> str:
     """
     Increments and returns the next formatted sequence number.
     Returns something like "QT-0001"
+
+    With leased=True the number comes from this worker's leased block, which
+    avoids a round trip per document but leaves gaps when a worker exits.
     """
-    sequence = await Sequence.find_one(
-        Sequence.company_id == company_id,
-        Sequence.entity == entity
-    )
-
-    if not sequence:
-        sequence = Sequence(
-            company_id=company_id,
-            entity=entity,
-            prefix=prefix,
-            current_value=1
-        )
-        await sequence.insert()
-    else:
-        sequence.current_value += 1
-        await sequence.save()
+    if leased:
+        return await sequence_leaser.next(company_id, entity, prefix)
+
+    value, seq_prefix, padding = await reserve_sequence_block(company_id, entity, prefix)
+    return format_sequence_number(seq_prefix, padding, value)
+
+class SequenceBlockLeaser:
+    """
+    Hands out numbers from blocks leased per worker process.
+    Intended for bulk imports where gaps in numbering are acceptable.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        # (company_id, entity) -> [next value, last value, prefix, padding]
+        self._blocks: Dict[Tuple[str, str], list] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    async def next(self, company_id: PydanticObjectId, entity: str, prefix: str) -> str:
+        key = (str(company_id), entity)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            block = self._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                first, seq_prefix, padding = await reserve_sequence_block(
+                    company_id, entity, prefix, self.block_size
+                )
+                block = [first, first + self.block_size - 1, seq_prefix, padding]
+                self._blocks[key] = block
+
+            value = block[0]
+            block[0] += 1
+            return format_sequence_number(block[2], block[3], value)
 
-    formatted_num = str(sequence.current_value).zfill(sequence.padding)
-    return f"{sequence.prefix}{formatted_num}"
+sequence_leaser = SequenceBlockLeaser(block_size=settings.SEQUENCE_LEASE_BLOCK_SIZE)
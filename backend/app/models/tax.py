@@ -1,11 +1,15 @@
-from beanie import Indexed
 from pydantic import Field
-from .base import TenantDocument
+from pymongo import IndexModel, ASCENDING
+from .base import TenantDocument, tenant_indexes
 
 class Tax(TenantDocument):
-    name: Indexed(str) = Field(..., description="Name of the tax (e.g., GST 18%)")
+    name: str = Field(..., description="Name of the tax (e.g., GST 18%)")
     rate: float = Field(..., ge=0, le=100, description="Tax rate in percentage")
     tax_type: str = Field(..., description="CGST / SGST / IGST / VAT")
 
     class Settings:
         name = "taxes"
+        indexes = tenant_indexes("name", "created_at") + [
+            # Duplicate-name checks and name sorts that include inactive documents
+            IndexModel([("company_id", ASCENDING), ("name", ASCENDING)], name="company_name"),
+        ]
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Optional
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+
+class RevokedToken(Document):
+    """
+    A revoked access token (by jti) or a whole login session (by refresh
+    family id). MongoDB's TTL monitor removes the entry once every token it
+    covers has expired anyway.
+    """
+    key: str = Field(..., description="jti of an access token, or a refresh token family id")
+    kind: str = Field(..., description="'token' or 'family'")
+    user_id: Optional[PydanticObjectId] = None
+    revoked_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+    class Settings:
+        name = "revoked_tokens"
+        indexes = [
+            IndexModel("key", unique=True, name="key_unique"),
+            IndexModel("expires_at", expireAfterSeconds=0, name="expires_at_ttl"),
+            # Incremental sync of the in-memory filter
+            IndexModel("revoked_at", name="revoked_at"),
+        ]
+
+class RefreshToken(Document):
+    """
+    One issued refresh token. Each refresh marks it used and issues the next
+    token in the same family; presenting a used token again revokes the family
+    (after REFRESH_REUSE_GRACE_SECONDS; concurrent refreshes are only refused).
+    """
+    jti: str
+    family: str
+    user_id: PydanticObjectId
+    issued_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    used_at: Optional[datetime] = None
+
+    class Settings:
+        name = "refresh_tokens"
+        indexes = [
+            IndexModel("jti", unique=True, name="jti_unique"),
+            IndexModel("family", name="family"),
+            IndexModel("expires_at", expireAfterSeconds=0, name="expires_at_ttl"),
+        ]
@@ -1,8 +1,21 @@
+import logging
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
-from beanie import Document, Indexed, PydanticObjectId
+from beanie import Document, Indexed, PydanticObjectId, after_event, Replace, Save, SaveChanges, Update, Delete
 from pydantic import EmailStr, Field
+from ..services.cache import user_cache
+from ..services.permission_cache import permission_cache
+
+logger = logging.getLogger(__name__)
+
+# user_cache entries are global, not per tenant
+USER_CACHE_SCOPE = None
+
+def _drop_cached_user(user_id: str):
+    user_cache.invalidate(USER_CACHE_SCOPE, "User", user_id)
+
+permission_cache.add_user_listener(_drop_cached_user)
 
 class UserStatus(str, Enum):
     ACTIVE = "active"
@@ -19,5 +32,19 @@ class User(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    async def invalidate_cache(self):
+        user_cache.invalidate(USER_CACHE_SCOPE, "User", self.id)
+        # Other workers drop their copies too (needs the redis backend to reach them)
+        try:
+            await permission_cache.user_changed(self.id)
+        except Exception:
+            # The write is committed; other workers' copies expire after USER_CACHE_TTL_SECONDS
+            logger.exception("Failed to broadcast change of user %s", self.id)
+
     class Settings:
         name = "users"
+        indexes = [
+            # Company membership lookups (dashboard counts, company user lists)
+            "company_ids",
+        ]
@@ -1,14 +1,22 @@
-from beanie import Indexed
 from pydantic import Field, EmailStr
 from typing import Optional
-from .base import TenantDocument
+from pymongo import IndexModel, ASCENDING
+from .base import TenantDocument, tenant_indexes, tenant_search_index
 
 class Vendor(TenantDocument):
-    name: Indexed(str) = Field(..., description="Vendor name")
+    name: str = Field(..., description="Vendor name")
     email: Optional[EmailStr] = Field(None, description="Contact email")
     phone: Optional[str] = Field(None, description="Contact phone")
     address: Optional[dict] = Field(None, description="Vendor address")
     gst_number: Optional[str] = Field(None, description="GST number")
+    name_lower: Optional[str] = Field(None, description="Normalized name for indexed search")
+    gst_normalized: Optional[str] = Field(None, description="Normalized GST number for indexed search")
 
     class Settings:
         name = "vendors"
+        indexes = tenant_indexes("name", "created_at") + [
+            # Name sorts that include inactive documents
+            IndexModel([("company_id", ASCENDING), ("name", ASCENDING)], name="company_name"),
+            tenant_search_index("name_lower", unique=True),
+            tenant_search_index("gst_normalized"),
+        ]
@@ -1,16 +1,68 @@
-from typing import TypeVar, Generic, List, Optional, Type
+import asyncio
+import base64
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TypeVar, Generic, List, Optional, Type, Dict, Any, Tuple, Callable, Union
 from beanie import PydanticObjectId
+from bson import json_util
 from pydantic import BaseModel
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 from ..models.base import TenantDocument
 from ..core.tenant import get_tenant_id
+from ..core.config import settings
+from ..core.singleflight import SingleFlight
+from ..services.cache import MasterDataCache, count_cache
+from ..services.permission_cache import permission_cache
 from fastapi import HTTPException, status
 
 T = TypeVar("T", bound=TenantDocument)
 
+logger = logging.getLogger(__name__)
+
+# Concurrent misses on cached repositories share one find_one per document
+master_loads = SingleFlight()
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    # Only filled when counts are requested
+    total: Optional[int] = None
+    facets: Optional[Dict[str, Dict[str, int]]] = None
+    counts_estimated: bool = False
+
+@lru_cache(maxsize=None)
+def raw_shape(schema: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    """
+    (Mongo field name, default) for every field of an output schema, used to
+    map raw documents straight to the response shape. Defaults are shared
+    between rows, which is fine because raw rows are only serialized.
+    """
+    return tuple(
+        (field.alias or name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in schema.model_fields.items()
+    )
+
 class BaseRepository(Generic[T]):
-    def __init__(self, model: Type[T]):
+    # Fields clients may sort by. Keyset pagination always breaks ties on _id,
+    # so every field listed here must be non-null on every document and
+    # should have a (company_id, field, _id) index on the model.
+    sort_fields: Tuple[str, ...] = ("_id", "created_at")
+    # Source field -> (normalized field, normalizer). The normalized copies are
+    # written on every create/update and are what search queries hit.
+    normalized_fields: Dict[str, Tuple[str, Callable[[Optional[str]], Optional[str]]]] = {}
+    # Fields whose per-value counts list endpoints can return next to the total
+    facet_fields: Tuple[str, ...] = ()
+    # Field backed by a unique index -> error detail when a write would duplicate it
+    unique_fields: Dict[str, str] = {}
+
+    def __init__(self, model: Type[T], cache: Optional[MasterDataCache] = None):
         self.model = model
+        self.cache = cache
 
     def _get_tenant_id(self) -> PydanticObjectId:
         tenant_id = get_tenant_id()
@@ -21,8 +73,67 @@ class BaseRepository(Generic[T]):
             )
         return tenant_id
 
+    def _normalize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill the normalized search fields for any source field present in data."""
+        for source, (target, normalizer) in self.normalized_fields.items():
+            if source in data:
+                data[target] = normalizer(data[source])
+        return data
+
+    def search_filter(self, term: str, contains: bool = False) -> Dict[str, Any]:
+        """
+        Filter matching `term` against every normalized field.
+        Prefix matches are anchored and use the (company_id, field) indexes;
+        contains=True is an escaped substring match that has to scan the tenant's keys.
+        """
+        clauses = []
+        for target, normalizer in self.normalized_fields.values():
+            normalized = normalizer(term)
+            if not normalized:
+                continue
+            pattern = re.escape(normalized)
+            clauses.append({target: {"$type": "string", "$regex": pattern if contains else f"^{pattern}"}})
+
+        if not clauses:
+            return {}
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def duplicate_message(self, error: Dict[str, Any]) -> str:
+        """
+        Maps a duplicate key error (DuplicateKeyError.details or a bulk writeError)
+        to the detail for the unique field it hit.
+        """
+        key_pattern = error.get("keyPattern") or {}
+        errmsg = error.get("errmsg", "")
+        for field, message in self.unique_fields.items():
+            if field in key_pattern or f"company_{field}_unique" in errmsg:
+                return message
+        return "Duplicate value"
+
+    def _raise_duplicate(self, error: DuplicateKeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=self.duplicate_message(error.details or {})
+        )
+
+    async def _invalidate(self, *ids: PydanticObjectId):
+        """Drop documents from the read-through cache after a write, here and on other workers."""
+        if self.cache is None or not ids:
+            return
+        tenant_id = self._get_tenant_id()
+        for id in ids:
+            self.cache.invalidate(tenant_id, self.model.__name__, id)
+        try:
+            await permission_cache.master_changed(tenant_id, self.model.__name__, list(ids))
+        except Exception:
+            # The write is committed; other workers' copies expire after MASTER_CACHE_TTL_SECONDS
+            logger.exception("Failed to broadcast %s cache invalidation", self.model.__name__)
+
     async def get(self, id: PydanticObjectId, include_inactive: bool = False) -> Optional[T]:
         """Fetch a single document by ID, scoped to the current tenant."""
+        if self.cache is not None:
+            return await self._get_cached(id, include_inactive)
+
         filters = [
             self.model.id == id,
             self.model.company_id == self._get_tenant_id()
@@ -32,66 +143,316 @@ class BaseRepository(Generic[T]):
             
         return await self.model.find_one(*filters)
 
-    async def list(self, skip: int = 0, limit: int = 100, include_inactive: bool = False) -> List[T]:
-        """List documents scoped to the current tenant."""
+    async def _get_cached(self, id: PydanticObjectId, include_inactive: bool) -> Optional[T]:
+        # Cache holds inactive documents too; the active check happens on every read
+        tenant_id = self._get_tenant_id()
+        db_obj = self.cache.get(tenant_id, self.model.__name__, id)
+        if db_obj is None:
+            # The epoch is part of the key so misses after a write don't join a load from before it
+            epoch = self.cache.begin_load()
+            db_obj = await master_loads.do(
+                (str(tenant_id), self.model.__name__, str(id), epoch),
+                lambda: self._fetch_into_cache(tenant_id, id, epoch)
+            )
+            if db_obj is None:
+                return None
+
+        if not include_inactive and not db_obj.is_active:
+            return None
+        return db_obj
+
+    async def _fetch_into_cache(self, tenant_id: PydanticObjectId, id: PydanticObjectId, epoch: int) -> Optional[T]:
+        db_obj = await self.model.find_one(
+            self.model.id == id,
+            self.model.company_id == tenant_id
+        )
+        if db_obj is not None:
+            self.cache.set(tenant_id, self.model.__name__, db_obj, epoch)
+        return db_obj
+
+    async def list(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        include_inactive: bool = False,
+        projection: Optional[Type[BaseModel]] = None
+    ) -> List[T]:
+        """
+        List documents scoped to the current tenant.
+        With a projection model only its fields are fetched and it is returned instead of T.
+        """
         query = self.model.find(self.model.company_id == self._get_tenant_id())
         if not include_inactive:
             query = query.find(self.model.is_active == True)
-            
+        if projection:
+            query = query.project(projection)
+
         return await query.skip(skip).limit(limit).to_list()
 
+    def _encode_cursor(self, sort_by: str, sort_order: int, doc: Union[T, Dict[str, Any]]) -> str:
+        if isinstance(doc, dict):
+            doc_id, value = doc["_id"], doc.get(sort_by)
+        else:
+            doc_id = doc.id
+            value = doc_id if sort_by == "_id" else getattr(doc, sort_by)
+        payload = json_util.dumps({"s": sort_by, "o": sort_order, "v": value, "id": doc_id})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, cursor: str, sort_by: str, sort_order: int) -> Tuple[Any, PydanticObjectId]:
+        try:
+            payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        # Decodable but not one of ours (tampered or from another endpoint)
+        if not isinstance(payload, dict) or "v" not in payload or "id" not in payload:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if payload.get("s") != sort_by or payload.get("o") != sort_order:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not match the requested sort"
+            )
+        return payload["v"], payload["id"]
+
+    def list_query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        include_inactive: bool = False,
+        cursor: Optional[str] = None,
+        sort_by: str = "_id",
+        sort_order: int = ASCENDING
+    ) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+        """
+        Builds the raw filter and sort used by list_page. Also used by
+        scripts/index_advisor.py to explain every list query shape.
+        """
+        if sort_by not in self.sort_fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot sort by '{sort_by}'. Allowed: {', '.join(self.sort_fields)}"
+            )
+
+        query: Dict[str, Any] = {"company_id": self._get_tenant_id()}
+        if not include_inactive:
+            query["is_active"] = True
+        if filters:
+            query.update(filters)
+
+        if cursor:
+            last_value, last_id = self._decode_cursor(cursor, sort_by, sort_order)
+            op = "$gt" if sort_order == ASCENDING else "$lt"
+            if sort_by == "_id":
+                seek = {"_id": {op: last_id}}
+            else:
+                seek = {"$or": [
+                    {sort_by: {op: last_value}},
+                    {sort_by: last_value, "_id": {op: last_id}}
+                ]}
+            query = {"$and": [query, seek]}
+
+        if sort_by == "_id":
+            return query, [("_id", sort_order)]
+        return query, [(sort_by, sort_order), ("_id", sort_order)]
+
+    async def list_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        include_inactive: bool = False,
+        limit: int = 100,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        sort_by: str = "_id",
+        sort_order: int = ASCENDING,
+        projection: Optional[Type[BaseModel]] = None,
+        with_counts: bool = False,
+        raw: bool = False
+    ) -> Page[T]:
+        """
+        List documents scoped to the current tenant, ordered by (sort_by, _id).
+        With a cursor the page is located by a keyset seek on the index instead
+        of skipping; skip is only honoured when no cursor is given.
+        With a projection model only its fields are fetched; it must include
+        the sort field so the next cursor can be built.
+        with_counts also fills total and facets for the whole (uncursored) query.
+        With raw=True the page is read through Motor and items are plain dicts in
+        the projection's output shape (Mongo field names), with no Beanie or
+        pydantic models built; pair it with RawJSONResponse.
+        """
+        query, sort = self.list_query(filters, include_inactive, cursor, sort_by, sort_order)
+        if raw:
+            if projection is None:
+                raise ValueError("raw reads need the output schema as projection")
+            shape = raw_shape(projection)
+            fields = {name: 1 for name, _ in shape}
+            fields[sort_by] = 1
+            find = self.model.get_motor_collection().find(query, fields).sort(sort)
+        else:
+            find = self.model.find(query).sort(sort)
+            if projection:
+                find = find.project(projection)
+        if skip and not cursor:
+            find = find.skip(skip)
+
+        # Fetch one extra document to know whether another page exists
+        fetch = find.limit(limit + 1).to_list(length=limit + 1) if raw else find.limit(limit + 1).to_list()
+        if with_counts:
+            count_query, _ = self.list_query(filters, include_inactive)
+            items, (total, facets, estimated) = await asyncio.gather(fetch, self.count(count_query))
+        else:
+            items = await fetch
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = self._encode_cursor(sort_by, sort_order, items[-1])
+        if raw:
+            items = [{name: doc.get(name, default) for name, default in shape} for doc in items]
+        page = Page(items=items, next_cursor=next_cursor)
+        if with_counts:
+            page.total, page.facets, page.counts_estimated = total, facets, estimated
+        return page
+
+    async def count(self, query: Dict[str, Any]) -> Tuple[int, Dict[str, Dict[str, int]], bool]:
+        """
+        Total and per-value facet_fields counts for a list query in one $facet
+        aggregation. Returns (total, facets, estimated). Results above
+        COUNT_ESTIMATE_THRESHOLD are cached for COUNT_CACHE_TTL_SECONDS and
+        served from there, so large tenants don't recount on every page.
+        """
+        tenant_id = self._get_tenant_id()
+        collection = self.model.get_collection_name()
+        key = json_util.dumps(query)
+        cached = count_cache.get(tenant_id, collection, key)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        facet: Dict[str, Any] = {"total": [{"$count": "count"}]}
+        for field in self.facet_fields:
+            facet[field] = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        result = await self.model.get_motor_collection().aggregate(
+            [{"$match": query}, {"$facet": facet}]
+        ).to_list(length=1)
+
+        buckets = result[0] if result else {}
+        total = buckets["total"][0]["count"] if buckets.get("total") else 0
+        facets = {
+            field: {str(bucket["_id"]): bucket["count"] for bucket in buckets.get(field, [])}
+            for field in self.facet_fields
+        }
+        if total > settings.COUNT_ESTIMATE_THRESHOLD:
+            count_cache.put(tenant_id, collection, key, (total, facets))
+        return total, facets, False
+
     async def create(self, document_in: BaseModel) -> T:
         """Create a new document, automatically injecting the current tenant ID."""
         tenant_id = self._get_tenant_id()
         
         # Convert Pydantic model to Beanie document and inject company_id
-        doc_dict = document_in.model_dump()
+        doc_dict = self._normalize(document_in.model_dump())
         doc_dict["company_id"] = tenant_id
         
         db_obj = self.model(**doc_dict)
-        await db_obj.insert()
+        try:
+            await db_obj.insert()
+        except DuplicateKeyError as e:
+            self._raise_duplicate(e)
         return db_obj
 
-    async def update(self, id: PydanticObjectId, document_in: BaseModel) -> Optional[T]:
-        """Update a document, ensuring it belongs to the current tenant."""
-        db_obj = await self.get(id, include_inactive=True)
-        if not db_obj:
-            return None
-            
-        update_data = document_in.model_dump(exclude_unset=True)
+    def _update_data(self, document_in: BaseModel) -> Dict[str, Any]:
+        update_data = self._normalize(document_in.model_dump(exclude_unset=True))
         # Ensure company_id is never changed via update
         update_data.pop("company_id", None)
         update_data["updated_at"] = datetime.utcnow()
-        
-        await db_obj.set(update_data)
-        return db_obj
+        return update_data
+
+    async def update_fields(self, id: PydanticObjectId, fields: Dict[str, Any]) -> Optional[T]:
+        """
+        $set fields on a tenant document in a single find_one_and_update and
+        return the post-image, or None if no such document exists for the tenant.
+        """
+        try:
+            raw = await self.model.get_motor_collection().find_one_and_update(
+                {"_id": id, "company_id": self._get_tenant_id()},
+                {"$set": fields},
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError as e:
+            self._raise_duplicate(e)
+        if raw is None:
+            return None
+        await self._invalidate(id)
+        return self.model.model_validate(raw)
+
+    async def set_status(
+        self, id: PydanticObjectId, new_status: str, fields: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Optional[T], Optional[T]]:
+        """
+        Moves an active tenant document to new_status (plus any extra fields) in
+        one atomic update. Returns (previous, updated); previous is None when
+        nothing changed because the document already had new_status, so
+        counters derived from the transition are applied exactly once.
+        """
+        update = {**(fields or {}), "status": new_status, "updated_at": datetime.utcnow()}
+        raw = await self.model.get_motor_collection().find_one_and_update(
+            {"_id": id, "company_id": self._get_tenant_id(), "is_active": True, "status": {"$ne": new_status}},
+            {"$set": update},
+            return_document=ReturnDocument.BEFORE
+        )
+        if raw is None:
+            return None, await self.get(id)
+        await self._invalidate(id)
+        previous = self.model.model_validate(raw)
+        return previous, previous.model_copy(update=update)
+
+    async def update(self, id: PydanticObjectId, document_in: BaseModel) -> Optional[T]:
+        """Update a document, ensuring it belongs to the current tenant."""
+        return await self.update_fields(id, self._update_data(document_in))
+
+    async def update_many_by_ids(self, ids: List[PydanticObjectId], document_in: BaseModel) -> int:
+        """Apply the same update to several tenant documents. Returns the number matched."""
+        try:
+            result = await self.model.get_motor_collection().update_many(
+                {"_id": {"$in": ids}, "company_id": self._get_tenant_id()},
+                {"$set": self._update_data(document_in)}
+            )
+        except DuplicateKeyError as e:
+            # update_many is not atomic: documents before the clash keep the update
+            await self._invalidate(*ids)
+            self._raise_duplicate(e)
+        await self._invalidate(*ids)
+        return result.matched_count
+
+    async def _set_active(self, ids: List[PydanticObjectId], is_active: bool) -> int:
+        """Returns the number of tenant documents matched, as get()/get(include_inactive) would find them."""
+        query = {"_id": {"$in": ids}, "company_id": self._get_tenant_id()}
+        if not is_active:
+            # Only live documents can be deactivated; activation accepts any state
+            query["is_active"] = True
+        result = await self.model.get_motor_collection().update_many(
+            query,
+            {"$set": {"is_active": is_active, "updated_at": datetime.utcnow()}}
+        )
+        await self._invalidate(*ids)
+        return result.matched_count
 
     async def deactivate(self, id: PydanticObjectId) -> bool:
         """Soft delete a document by setting is_active to False."""
-        db_obj = await self.get(id)
-        if not db_obj:
-            return False
-        
-        await db_obj.set({self.model.is_active: False, self.model.updated_at: datetime.utcnow()})
-        return True
+        return await self._set_active([id], False) > 0
+
+    async def deactivate_many(self, ids: List[PydanticObjectId]) -> int:
+        """Soft delete several documents. Returns the number matched (previously active)."""
+        return await self._set_active(ids, False)
 
     async def activate(self, id: PydanticObjectId) -> bool:
         """Reactivate a soft-deleted document."""
-        db_obj = await self.get(id, include_inactive=True)
-        if not db_obj:
-            return False
-        
-        await db_obj.set({self.model.is_active: True, self.model.updated_at: datetime.utcnow()})
-        return True
+        return await self._set_active([id], True) > 0
 
     async def delete(self, id: PydanticObjectId) -> bool:
         """Delete a document, ensuring it belongs to the current tenant."""
-        db_obj = await self.get(id)
-        if not db_obj:
-            return False
-            
-        await db_obj.delete()
-        return True
+        result = await self.model.get_motor_collection().delete_one(
+            {"_id": id, "company_id": self._get_tenant_id(), "is_active": True}
+        )
+        await self._invalidate(id)
+        return result.deleted_count > 0
 
     def query(self):
         """Returns a Beanie find query pre-filtered by the current tenant ID."""
@@ -1,32 +1,71 @@
 from .base import BaseRepository
+from ..models.base import normalize_name, normalize_code
 from ..models.customer import Customer
 from ..models.vendor import Vendor
 from ..models.item import Item
 from ..models.category import ItemCategory
 from ..models.tax import Tax
 from ..models.price_list import PriceList
+from ..services.cache import master_cache
+from ..services.permission_cache import permission_cache
+
+def _drop_cached_masters(company_id: str, collection: str, doc_ids: list):
+    for doc_id in doc_ids:
+        master_cache.invalidate(company_id, collection, doc_id)
+
+# Writes on other workers (needs the redis backend to reach them)
+permission_cache.add_master_listener(_drop_cached_masters)
+
+# Masters are typically browsed alphabetically
+MASTER_SORT_FIELDS = BaseRepository.sort_fields + ("name",)
+
+NAME_SEARCH = {"name": ("name_lower", normalize_name)}
+
+def unique_name(label: str) -> dict:
+    return {"name_lower": f"{label} with this name already exists"}
 
 class CustomerRepository(BaseRepository[Customer]):
+    sort_fields = MASTER_SORT_FIELDS
+    normalized_fields = {**NAME_SEARCH, "gst_number": ("gst_normalized", normalize_code)}
+    unique_fields = {**unique_name("Customer"), "gst_normalized": "Customer with this GST number already exists"}
+
     def __init__(self):
         super().__init__(Customer)
 
 class VendorRepository(BaseRepository[Vendor]):
+    sort_fields = MASTER_SORT_FIELDS
+    normalized_fields = {**NAME_SEARCH, "gst_number": ("gst_normalized", normalize_code)}
+    unique_fields = unique_name("Vendor")
+
     def __init__(self):
         super().__init__(Vendor)
 
 class ItemRepository(BaseRepository[Item]):
+    sort_fields = MASTER_SORT_FIELDS
+    normalized_fields = {**NAME_SEARCH, "sku": ("sku_normalized", normalize_code)}
+    unique_fields = {**unique_name("Item"), "sku_normalized": "Item with this SKU already exists"}
+    facet_fields = ("item_type",)
+
     def __init__(self):
-        super().__init__(Item)
+        super().__init__(Item, cache=master_cache)
 
 class CategoryRepository(BaseRepository[ItemCategory]):
+    sort_fields = MASTER_SORT_FIELDS
+    normalized_fields = NAME_SEARCH
+    unique_fields = unique_name("Category")
+
     def __init__(self):
         super().__init__(ItemCategory)
 
 class TaxRepository(BaseRepository[Tax]):
+    sort_fields = MASTER_SORT_FIELDS
+
     def __init__(self):
-        super().__init__(Tax)
+        super().__init__(Tax, cache=master_cache)
 
 class PriceListRepository(BaseRepository[PriceList]):
+    sort_fields = MASTER_SORT_FIELDS
+
     def __init__(self):
         super().__init__(PriceList)
 
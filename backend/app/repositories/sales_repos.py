@@ -3,18 +3,29 @@ from ..models.sales import Quotation, SalesOrder, Invoice, CreditNote
 from ..models.sequence import Sequence
 
 class QuotationRepository(BaseRepository[Quotation]):
+    sort_fields = BaseRepository.sort_fields + ("quote_number", "grand_total")
+    facet_fields = ("status",)
+
     def __init__(self):
         super().__init__(Quotation)
 
 class SalesOrderRepository(BaseRepository[SalesOrder]):
+    sort_fields = BaseRepository.sort_fields + ("order_number", "grand_total")
+    facet_fields = ("status",)
+
     def __init__(self):
         super().__init__(SalesOrder)
 
 class InvoiceRepository(BaseRepository[Invoice]):
+    sort_fields = BaseRepository.sort_fields + ("invoice_number", "grand_total")
+    facet_fields = ("status",)
+
     def __init__(self):
         super().__init__(Invoice)
 
 class CreditNoteRepository(BaseRepository[CreditNote]):
+    sort_fields = BaseRepository.sort_fields + ("credit_note_number",)
+
     def __init__(self):
         super().__init__(CreditNote)
 
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List
+from beanie import PydanticObjectId
+
+# Upper bound for multi-select actions from the UI
+MAX_BULK_IDS = 1000
+
+class BulkIds(BaseModel):
+    ids: List[PydanticObjectId] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+
+class BulkActionResult(BaseModel):
+    matched: int
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based data row number (CSV header not counted)
+    name: Optional[str] = None
+    error: str
+
+class ImportResult(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
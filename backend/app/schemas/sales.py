@@ -41,6 +41,19 @@ class QuotationRead(BaseModel):
     
     model_config = {"from_attributes": True, "populate_by_name": True}
 
+class QuotationSummary(BaseModel):
+    """Quotation row for list views, without line items."""
+    id: PydanticObjectId = Field(..., alias="_id")
+    quote_number: str
+    customer_id: PydanticObjectId
+    customer_name: str
+    grand_total: float
+    status: str
+    valid_until: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True, "populate_by_name": True}
+
 # --- Sales Order ---
 class SalesOrderCreate(BaseModel):
     customer_id: PydanticObjectId
@@ -62,6 +75,18 @@ class SalesOrderRead(BaseModel):
 
     model_config = {"from_attributes": True, "populate_by_name": True}
 
+class SalesOrderSummary(BaseModel):
+    """Sales order row for list views, without line items."""
+    id: PydanticObjectId = Field(..., alias="_id")
+    order_number: str
+    customer_id: PydanticObjectId
+    customer_name: str
+    grand_total: float
+    status: str
+    created_at: datetime
+
+    model_config = {"from_attributes": True, "populate_by_name": True}
+
 # --- Invoice ---
 class InvoiceCreate(BaseModel):
     customer_id: PydanticObjectId
@@ -81,6 +106,44 @@ class InvoiceRead(BaseModel):
     grand_total: float
     status: str
     due_date: Optional[datetime]
+    issued_at: Optional[datetime] = None
     created_at: datetime
 
     model_config = {"from_attributes": True, "populate_by_name": True}
+
+class InvoiceSummary(BaseModel):
+    """Invoice row for list views, without line items."""
+    id: PydanticObjectId = Field(..., alias="_id")
+    invoice_number: str
+    customer_id: PydanticObjectId
+    customer_name: str
+    grand_total: float
+    status: str
+    due_date: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True, "populate_by_name": True}
+
+# --- Bulk creation ---
+MAX_BULK_DOCUMENTS = 1000
+
+class QuotationBulkCreate(BaseModel):
+    documents: List[QuotationCreate] = Field(..., min_length=1, max_length=MAX_BULK_DOCUMENTS)
+
+class SalesOrderBulkCreate(BaseModel):
+    documents: List[SalesOrderCreate] = Field(..., min_length=1, max_length=MAX_BULK_DOCUMENTS)
+
+class InvoiceBulkCreate(BaseModel):
+    documents: List[InvoiceCreate] = Field(..., min_length=1, max_length=MAX_BULK_DOCUMENTS)
+
+class BulkCreateResult(BaseModel):
+    index: int  # Position of the document in the request batch
+    success: bool
+    id: Optional[PydanticObjectId] = None
+    number: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkCreateResult]
@@ -1,74 +1,347 @@
+import asyncio
+import hashlib
+import logging
 import time
-from typing import Set, Dict, Optional, Any
+from collections import OrderedDict
+from typing import Set, Dict, Optional, Any, Iterable, List, Tuple
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PermissionKey = Tuple[str, str]
 
 class PermissionCache:
     """
-    In-memory cache for user permissions.
-    Designed to be easily replaceable with Redis.
+    Per-process (L1) size-bounded LRU + TTL cache of permission masks
+    (see PermissionIndex) per (user, company). services.permission_cache puts it in front of a shared backend.
+    Secondary indexes by user and by company make invalidation proportional
+    to the number of affected entries. Methods never await, so each call is
+    atomic with respect to other coroutines on the event loop.
+
+    Loads race with invalidation: take begin_load() before reading roles and
+    pass it to set_permissions, which drops the result if anything was
+    invalidated in between.
     """
-    _instance: Optional['PermissionCache'] = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(PermissionCache, cls).__new__(cls)
-            cls._instance._cache: Dict[str, Dict[str, Any]] = {}
-            cls._instance._ttl = 300  # 5 minutes default
-        return cls._instance
-
-    def _get_key(self, user_id: str, company_id: str) -> str:
-        return f"perm_cache:{user_id}:{company_id}"
-
-    def get_permissions(self, user_id: str, company_id: str) -> Optional[Set[str]]:
-        key = self._get_key(user_id, company_id)
-        entry = self._cache.get(key)
-        
-        if not entry:
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        # LRU order
+        self._entries: "OrderedDict[PermissionKey, Tuple[float, int]]" = OrderedDict()
+        # Write order, which is also expiry order because the TTL is fixed
+        self._expiry: "OrderedDict[PermissionKey, float]" = OrderedDict()
+        self._by_user: Dict[str, Set[PermissionKey]] = {}
+        self._by_company: Dict[str, Set[PermissionKey]] = {}
+        self._epoch = 0
+        self._purge_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _key(self, user_id: Any, company_id: Any) -> PermissionKey:
+        return (str(user_id), str(company_id))
+
+    def _remove(self, key: PermissionKey):
+        self._entries.pop(key, None)
+        self._expiry.pop(key, None)
+        user_id, company_id = key
+        for index, value in ((self._by_user, user_id), (self._by_company, company_id)):
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+
+    def get_permissions(self, user_id: Any, company_id: Any) -> Optional[int]:
+        key = self._key(user_id, company_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
             return None
-            
-        if time.time() > entry['expiry']:
-            del self._cache[key]
+
+        expiry, permissions = entry
+        if time.monotonic() > expiry:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
             return None
-            
-        print(f"CACHE HIT: Permissions for user {user_id} in company {company_id}")
-        return entry['permissions']
-
-    def set_permissions(self, user_id: str, company_id: str, permissions: Set[str]):
-        key = self._get_key(user_id, company_id)
-        self._cache[key] = {
-            'permissions': permissions,
-            'expiry': time.time() + self._ttl
-        }
-        print(f"CACHE SET: Permissions for user {user_id} in company {company_id}")
 
-    def invalidate(self, user_id: str, company_id: Optional[str] = None):
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return permissions
+
+    def begin_load(self) -> int:
+        return self._epoch
+
+    def set_permissions(self, user_id: Any, company_id: Any, permissions: int, epoch: Optional[int] = None):
+        if epoch is not None and epoch != self._epoch:
+            # Roles changed while this set was being loaded; don't cache it
+            return
+        key = self._key(user_id, company_id)
+        expiry = time.monotonic() + self._ttl
+        self._entries[key] = (expiry, permissions)
+        self._entries.move_to_end(key)
+        self._expiry[key] = expiry
+        self._expiry.move_to_end(key)
+        self._by_user.setdefault(key[0], set()).add(key)
+        self._by_company.setdefault(key[1], set()).add(key)
+
+        while len(self._entries) > self._max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cached permissions for user %s in company %s", user_id, company_id)
+
+    def invalidate(self, user_id: Any, company_id: Optional[Any] = None):
         """
         Invalidate cache for a specific user.
         If company_id is provided, only that specific context is cleared.
         If company_id is None, all company contexts for that user are cleared.
         """
+        self._epoch += 1
         if company_id:
-            key = self._get_key(user_id, company_id)
-            if key in self._cache:
-                del self._cache[key]
-                print(f"CACHE INVALIDATE: Key {key}")
+            keys = [self._key(user_id, company_id)]
         else:
-            # Clear all keys for this user
-            prefix = f"perm_cache:{user_id}:"
-            keys_to_del = [k for k in self._cache.keys() if k.startswith(prefix)]
-            for k in keys_to_del:
-                del self._cache[k]
-                print(f"CACHE INVALIDATE: Key {k}")
-
-    def invalidate_all_for_company(self, company_id: str):
+            keys = list(self._by_user.get(str(user_id), ()))
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Invalidated %d permission entries for user %s", len(keys), user_id)
+
+    def invalidate_all_for_company(self, company_id: Any):
         """
         Clear cache for ALL users in a specific company.
         Useful when a Role is updated.
         """
-        suffix = f":{company_id}"
-        keys_to_del = [k for k in self._cache.keys() if k.endswith(suffix)]
-        for k in keys_to_del:
-            del self._cache[k]
-            print(f"CACHE INVALIDATE ALL: Company {company_id}")
-
-# Global singleton instance
-permission_cache = PermissionCache()
+        self._epoch += 1
+        keys = list(self._by_company.get(str(company_id), ()))
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Invalidated %d permission entries for company %s", len(keys), company_id)
+
+    def purge_expired(self) -> int:
+        """Drops expired entries, oldest first; stops at the first live one."""
+        now = time.monotonic()
+        purged = 0
+        while self._expiry:
+            key, expiry = next(iter(self._expiry.items()))
+            if expiry > now:
+                break
+            self._remove(key)
+            purged += 1
+        self.expirations += purged
+        return purged
+
+    async def _purge_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            purged = self.purge_expired()
+            if purged and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Purged %d expired permission entries", purged)
+
+    def start_expiry(self, interval: float):
+        """Starts background expiry on the running event loop (call from startup)."""
+        if self._purge_task is None or self._purge_task.done():
+            self._purge_task = asyncio.create_task(self._purge_loop(interval))
+
+    def stop_expiry(self):
+        if self._purge_task is not None:
+            self._purge_task.cancel()
+            self._purge_task = None
+
+    def clear(self):
+        self._epoch += 1
+        self._entries.clear()
+        self._expiry.clear()
+        self._by_user.clear()
+        self._by_company.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+class MasterDataCache:
+    """
+    Per-tenant, size-bounded LRU cache with TTL for master documents (items, taxes).
+    Entries are keyed by (company_id, collection, document_id) so one tenant can
+    never read another tenant's documents.
+
+    Loaders take begin_load() before reading the database and pass it to
+    set()/put(); any invalidation in between bumps the epoch and the write is
+    dropped, so a document read before a write can't be cached after it.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, company_id: Any, collection: str, doc_id: Any) -> Tuple[str, str, str]:
+        return (str(company_id), collection, str(doc_id))
+
+    def get(self, company_id: Any, collection: str, doc_id: Any) -> Optional[Any]:
+        key = self._key(company_id, collection, doc_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expiry, doc = entry
+        if time.monotonic() > expiry:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return doc
+
+    def get_many(self, company_id: Any, collection: str, doc_ids: Iterable[Any]) -> Tuple[Dict[Any, Any], List[Any]]:
+        """Returns (found documents by id, ids that must be loaded from the database)."""
+        found: Dict[Any, Any] = {}
+        missing: List[Any] = []
+        for doc_id in doc_ids:
+            doc = self.get(company_id, collection, doc_id)
+            if doc is None:
+                missing.append(doc_id)
+            else:
+                found[doc_id] = doc
+        return found, missing
+
+    def begin_load(self) -> int:
+        return self._epoch
+
+    def set(self, company_id: Any, collection: str, doc: Any, epoch: Optional[int] = None):
+        self.put(company_id, collection, doc.id, doc, epoch)
+
+    def put(self, company_id: Any, collection: str, key_id: Any, value: Any, epoch: Optional[int] = None):
+        """
+        Stores an arbitrary value under (company_id, collection, key_id), unless
+        epoch is given and something was invalidated since begin_load().
+        """
+        if epoch is not None and epoch != self._epoch:
+            return
+        key = self._key(company_id, collection, key_id)
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, company_id: Any, collection: str, doc_id: Any):
+        self._epoch += 1
+        self._entries.pop(self._key(company_id, collection, doc_id), None)
+
+    def clear(self):
+        self._epoch += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class VerifiedTokenCache:
+    """
+    Size-bounded LRU of JWT claims that already passed signature verification,
+    keyed by the SHA-256 of the raw token. An entry is only served until the
+    token's own exp, so caching never extends a token's lifetime.
+    """
+
+    def __init__(self, max_entries: int):
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, claims = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def set(self, token: str, claims: Dict[str, Any]):
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            # Tokens without exp are never cached
+            return
+        key = self._key(token)
+        self._entries[key] = (float(expires_at), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+# Shared cache for Item and Tax masters
+master_cache = MasterDataCache(
+    max_entries=settings.MASTER_CACHE_MAX_ENTRIES,
+    ttl=settings.MASTER_CACHE_TTL_SECONDS
+)
+
+# List-endpoint counts for large tenants, keyed by the serialized list query
+count_cache = MasterDataCache(
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+
+# Claims of access tokens verified by AuthMiddleware
+token_cache = VerifiedTokenCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+
+# User documents for get_current_user, invalidated by User save/update/delete events
+user_cache = MasterDataCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+# Dashboard statistics per company (services.dashboard_service)
+dashboard_cache = MasterDataCache(
+    max_entries=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS
+)
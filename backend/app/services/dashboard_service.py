@@ -0,0 +1,61 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict
+from beanie import PydanticObjectId
+from ..core.singleflight import SingleFlight
+from ..models.user import User
+from ..models.role import Role
+from ..models.company import Company
+from ..models.company_stats import CompanyStats, month_key
+from .cache import dashboard_cache
+
+CACHE_COLLECTION = "DashboardStats"
+
+class DashboardService:
+    """
+    Dashboard statistics per company: member and role counts, the company
+    name and sales KPIs from the pre-aggregated CompanyStats counters.
+    Cached briefly per company; the queries behind a miss run concurrently.
+    """
+
+    def __init__(self):
+        self._loads = SingleFlight()
+        # Bumped by invalidate() so a load that started earlier doesn't repopulate the cache
+        self._generations: Dict[str, int] = defaultdict(int)
+
+    async def get_stats(self, company_id: PydanticObjectId) -> Dict[str, Any]:
+        stats = dashboard_cache.get(company_id, CACHE_COLLECTION, company_id)
+        if stats is None:
+            generation = self._generations[str(company_id)]
+            stats = await self._loads.do(
+                (str(company_id), generation), lambda: self._load(company_id, generation)
+            )
+        return stats
+
+    async def _load(self, company_id: PydanticObjectId, generation: int) -> Dict[str, Any]:
+        user_count, role_count, company, counters = await asyncio.gather(
+            User.find(User.company_ids == company_id).count(),
+            Role.find(Role.company_id == company_id).count(),
+            Company.get(company_id),
+            CompanyStats.find_one(CompanyStats.company_id == company_id)
+        )
+        counters = counters or CompanyStats(company_id=company_id)
+        stats = {
+            "user_count": user_count,
+            "role_count": role_count,
+            "company_name": company.name if company else "Unknown Workspace",
+            "open_quotations": counters.open_quotations,
+            "unpaid_invoice_total": round(counters.unpaid_invoice_total, 2),
+            "month_revenue": round(counters.revenue_by_month.get(month_key(datetime.utcnow()), 0.0), 2),
+        }
+        if self._generations[str(company_id)] == generation:
+            dashboard_cache.put(company_id, CACHE_COLLECTION, company_id, stats)
+        return stats
+
+    def invalidate(self, company_id: PydanticObjectId):
+        """Call after membership, role, company or sales counter changes."""
+        self._generations[str(company_id)] += 1
+        dashboard_cache.invalidate(company_id, CACHE_COLLECTION, company_id)
+
+dashboard_service = DashboardService()
@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from ..core.serialization import json_default
+from ..repositories.base import BaseRepository
+
+# Rows are buffered into chunks of this many before being written to the socket
+EXPORT_CHUNK_ROWS = 500
+# Documents fetched from MongoDB per cursor batch
+EXPORT_BATCH_SIZE = 1000
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return json.dumps(value, default=json_default)
+    if isinstance(value, list):
+        # Same ';'-separated convention the CSV import understands
+        return ";".join(str(v) for v in value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def schema_columns(schema: Type[BaseModel], exclude: tuple = ()) -> List[str]:
+    """Mongo field names of an output schema, in declaration order."""
+    return [
+        field.alias or name
+        for name, field in schema.model_fields.items()
+        if name not in exclude
+    ]
+
+class ExportService:
+    """
+    Streams tenant documents straight from a Motor cursor as CSV or NDJSON.
+    Only one cursor batch and one output chunk are held in memory at a time.
+    """
+
+    def build_query(
+        self,
+        repo: BaseRepository,
+        include_inactive: bool = False,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        filters: Dict[str, Any] = {}
+        if created_from or created_to:
+            filters["created_at"] = {}
+            if created_from:
+                filters["created_at"]["$gte"] = created_from
+            if created_to:
+                filters["created_at"]["$lt"] = created_to
+        if status:
+            filters["status"] = status
+        query, _ = repo.list_query(filters, include_inactive)
+        return query
+
+    def _rows(self, doc: Dict[str, Any], flatten_items: bool) -> List[Dict[str, Any]]:
+        if not flatten_items:
+            return [doc]
+        lines = doc.pop("items", None) or []
+        return [{**doc, **{f"item_{k}": v for k, v in line.items()}} for line in lines]
+
+    async def _ndjson(self, cursor, flatten_items: bool) -> AsyncIterator[str]:
+        chunk: List[str] = []
+        async for doc in cursor:
+            for row in self._rows(doc, flatten_items):
+                chunk.append(orjson.dumps(row, default=json_default).decode())
+            if len(chunk) >= EXPORT_CHUNK_ROWS:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    async def _csv(self, cursor, columns: List[str], flatten_items: bool) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        rows = 0
+        async for doc in cursor:
+            for row in self._rows(doc, flatten_items):
+                writer.writerow([_csv_cell(row.get(column)) for column in columns])
+                rows += 1
+            if rows >= EXPORT_CHUNK_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                rows = 0
+        yield buffer.getvalue()
+
+    def export(
+        self,
+        repo: BaseRepository,
+        query: Dict[str, Any],
+        fmt: str,
+        columns: List[str],
+        filename: str,
+        item_columns: Optional[List[str]] = None,
+        flatten_items: bool = False
+    ) -> StreamingResponse:
+        """
+        item_columns are the line-item fields of sales documents; with
+        flatten_items every line becomes its own row prefixed with item_.
+        """
+        projection = {column: 1 for column in columns}
+        if flatten_items and item_columns:
+            projection["items"] = 1
+            columns = columns + [f"item_{c}" for c in item_columns]
+        elif fmt == "ndjson" and item_columns:
+            # NDJSON keeps line items nested unless flattened
+            projection["items"] = 1
+        flatten = flatten_items and bool(item_columns)
+
+        cursor = repo.model.get_motor_collection().find(
+            query, projection, batch_size=EXPORT_BATCH_SIZE
+        ).sort("_id", 1)
+
+        if fmt == "csv":
+            body = self._csv(cursor, columns, flatten)
+            media_type = "text/csv"
+        else:
+            body = self._ndjson(cursor, flatten)
+            media_type = "application/x-ndjson"
+
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+        )
+
+export_service = ExportService()
@@ -0,0 +1,188 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+from ..core.config import settings
+from ..repositories.base import BaseRepository
+from ..schemas.imports import ImportResult, ImportRowError
+
+# CSV cells for these fields hold several values separated by ';'
+LIST_FIELDS = {"tax_ids"}
+
+# CSV cells for these fields hold a JSON object
+DICT_FIELDS = {"billing_address", "shipping_address", "address"}
+
+# MongoDB error code for a unique index violation
+DUPLICATE_KEY = 11000
+
+class BadRow:
+    """Yielded instead of a row that could not be parsed, so the import reports it and goes on."""
+
+    def __init__(self, error: str, name: Optional[str] = None):
+        self.error = error
+        self.name = name
+
+def _parse_csv_cell(field: str, value: str) -> Any:
+    value = value.strip()
+    if field in DICT_FIELDS:
+        return json.loads(value)
+    if field in LIST_FIELDS:
+        return [v.strip() for v in value.split(";") if v.strip()]
+    return value
+
+def _csv_row(raw: Dict[str, Any]) -> Union[Dict[str, Any], BadRow]:
+    row = {}
+    for field, value in raw.items():
+        # Empty cells mean "not provided" so schema defaults apply
+        if not field or value in (None, ""):
+            continue
+        try:
+            row[field] = _parse_csv_cell(field, value)
+        except json.JSONDecodeError as e:
+            return BadRow(f"{field}: invalid JSON ({e.msg})", raw.get("name"))
+    return row
+
+def _csv_rows(text: io.TextIOBase) -> Iterator[Union[Dict[str, Any], BadRow]]:
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            raw = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # The reader resumes at the next line
+            yield BadRow(f"Malformed CSV row: {e}")
+            continue
+        yield _csv_row(raw)
+
+def _ndjson_rows(text: io.TextIOBase) -> Iterator[Union[Dict[str, Any], BadRow]]:
+    for line in text:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield BadRow(f"Invalid JSON: {e.msg}")
+
+def _read_batch(numbered: Iterator, size: int) -> Tuple[list, Optional[Exception]]:
+    """
+    Up to `size` numbered rows. An error that ends the stream (e.g. bad
+    encoding) is returned with the rows read before it instead of raised.
+    """
+    batch = []
+    try:
+        for item in islice(numbered, size):
+            batch.append(item)
+    except (csv.Error, UnicodeDecodeError) as e:
+        return batch, e
+    return batch, None
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+class ImportService:
+    """
+    Streams CSV/NDJSON uploads into master collections in fixed-size batches.
+    Memory is bounded by the batch size plus the set of names already seen.
+    """
+
+    async def import_rows(
+        self,
+        file: UploadFile,
+        fmt: Optional[str],
+        repo: BaseRepository,
+        schema: Type[BaseModel],
+        prepare: Optional[Callable[[BaseModel], BaseModel]] = None
+    ) -> ImportResult:
+        fmt = fmt or ("ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv")
+        tenant_id = repo._get_tenant_id()
+        name_field, normalize = repo.normalized_fields["name"]
+
+        # The upload is already spooled to disk by Starlette; read it lazily from there
+        text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        rows = _csv_rows(text) if fmt == "csv" else _ndjson_rows(text)
+        numbered = enumerate(rows, start=1)
+
+        seen_names = set()
+        errors: List[ImportRowError] = []
+        total_rows = 0
+        imported = 0
+
+        stream_error = None
+        while stream_error is None:
+            batch, stream_error = await run_in_threadpool(_read_batch, numbered, settings.IMPORT_BATCH_SIZE)
+            if stream_error is not None:
+                # Nothing after this point can be read; report it and keep what was imported
+                errors.append(ImportRowError(
+                    row=total_rows + len(batch) + 1,
+                    error=f"Could not parse {fmt} upload from this row on: {stream_error}"
+                ))
+            if not batch:
+                break
+            total_rows += len(batch)
+
+            # 1. Validate and dedupe within the file
+            candidates: List[Tuple[int, Dict[str, Any]]] = []
+            for row_no, row in batch:
+                if isinstance(row, BadRow):
+                    errors.append(ImportRowError(row=row_no, name=row.name, error=row.error))
+                    continue
+                try:
+                    data = schema.model_validate(row)
+                except ValidationError as e:
+                    name = row.get("name") if isinstance(row, dict) else None
+                    errors.append(ImportRowError(row=row_no, name=name, error=_format_validation_error(e)))
+                    continue
+                if prepare:
+                    data = prepare(data)
+                doc = repo._normalize(data.model_dump())
+                key = doc[name_field]
+                if key in seen_names:
+                    errors.append(ImportRowError(row=row_no, name=data.name, error="Duplicate name in file"))
+                    continue
+                seen_names.add(key)
+                candidates.append((row_no, doc))
+
+            # 2. Unordered write so one bad row doesn't stop the rest of the batch.
+            # Names already in the database are rejected by the unique indexes.
+            to_insert = [(row_no, repo.model(**doc, company_id=tenant_id)) for row_no, doc in candidates]
+            if to_insert:
+                failed_positions = set()
+                try:
+                    await repo.model.insert_many([doc for _, doc in to_insert], ordered=False)
+                except BulkWriteError as e:
+                    for write_error in e.details.get("writeErrors", []):
+                        position = write_error["index"]
+                        failed_positions.add(position)
+                        row_no, doc = to_insert[position]
+                        if write_error.get("code") == DUPLICATE_KEY:
+                            error = repo.duplicate_message(write_error)
+                        else:
+                            error = write_error.get("errmsg", "Write failed")
+                        errors.append(ImportRowError(row=row_no, name=doc.name, error=error))
+                imported += len(to_insert) - len(failed_positions)
+
+        errors.sort(key=lambda e: e.row)
+        return ImportResult(
+            total_rows=total_rows,
+            imported=imported,
+            failed=len(errors),
+            errors=errors
+        )
+
+    def error_report_csv(self, result: ImportResult) -> str:
+        """Per-row error report for download."""
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["row", "name", "error"])
+        for e in result.errors:
+            writer.writerow([e.row, e.name or "", e.error])
+        return out.getvalue()
+
+import_service = ImportService()
@@ -0,0 +1,277 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+from ..core.config import settings
+from .cache import PermissionCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Only needed with PERMISSION_CACHE_BACKEND=redis
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class LoadToken:
+    """What a cache miss observed, so a late store of stale permissions is dropped."""
+    epoch: int
+    generation: int = 0
+
+class PermissionCacheBackend:
+    """
+    Shared (L2) store behind the per-process PermissionCache. The base class
+    is the single-worker backend: nothing is shared and nothing is broadcast.
+    """
+
+    async def get(self, user_id: str, company_id: str) -> Tuple[Optional[int], int]:
+        """Returns (permission mask or None, current company generation)."""
+        return None, 0
+
+    async def set(self, user_id: str, company_id: str, permissions: int, generation: int, ttl: float):
+        pass
+
+    async def invalidate(self, user_id: Optional[str], company_id: Optional[str]):
+        """Bumps the generation of the affected companies and tells other workers."""
+        pass
+
+    async def publish_user_changed(self, user_id: str):
+        """Tells other workers a User document changed, so they drop cached copies."""
+        pass
+
+    async def publish_master_changed(self, company_id: str, collection: str, doc_ids: List[str]):
+        """Tells other workers master documents changed, so they drop cached copies."""
+        pass
+
+    async def listen(self, on_invalidate, on_user_changed, on_master_changed):
+        """
+        Calls on_invalidate(user_id, company_id) for invalidations from other
+        workers, on_user_changed(user_id) for their User changes and
+        on_master_changed(company_id, collection, doc_ids) for their master writes.
+        """
+        pass
+
+    async def close(self):
+        pass
+
+class RedisPermissionBackend(PermissionCacheBackend):
+    """
+    Redis L2. Each company is one hash: a field per user holding
+    {"g": generation, "e": expiry, "p": permission mask} plus a "_gen" counter.
+    Invalidation increments "_gen", so entries written by a load that started
+    before the invalidation no longer match and are ignored. A per-user set of
+    company ids supports invalidating a user everywhere.
+    Invalidations are also published on a channel so every worker clears its L1.
+
+    Any redis.asyncio-compatible client works, e.g. fakeredis.aioredis.FakeRedis().
+    """
+
+    GENERATION_FIELD = "_gen"
+
+    def __init__(self, client, channel: str, ttl: float):
+        self.client = client
+        self.channel = channel
+        self.ttl = int(ttl)
+        self.worker_id = uuid.uuid4().hex
+
+    def _company_key(self, company_id: str) -> str:
+        return f"perm:{company_id}"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"perm_user:{user_id}"
+
+    async def get(self, user_id: str, company_id: str) -> Tuple[Optional[int], int]:
+        raw, generation = await self.client.hmget(self._company_key(company_id), user_id, self.GENERATION_FIELD)
+        generation = int(generation or 0)
+        if raw is None:
+            return None, generation
+        entry = json.loads(raw)
+        if entry["g"] != generation or entry["e"] < time.time():
+            return None, generation
+        return entry["p"], generation
+
+    async def set(self, user_id: str, company_id: str, permissions: int, generation: int, ttl: float):
+        entry = json.dumps({"g": generation, "e": time.time() + ttl, "p": permissions})
+        company_key = self._company_key(company_id)
+        user_key = self._user_key(user_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(company_key, user_id, entry)
+            pipe.expire(company_key, self.ttl)
+            pipe.sadd(user_key, company_id)
+            pipe.expire(user_key, self.ttl)
+            await pipe.execute()
+
+    async def invalidate(self, user_id: Optional[str], company_id: Optional[str]):
+        if company_id:
+            company_ids = [company_id]
+        else:
+            company_ids = [c.decode() if isinstance(c, bytes) else c
+                           for c in await self.client.smembers(self._user_key(user_id))]
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for cid in company_ids:
+                # Per-company generation: also covers single-user changes, which are rare admin actions
+                pipe.hincrby(self._company_key(cid), self.GENERATION_FIELD, 1)
+                pipe.expire(self._company_key(cid), self.ttl)
+            pipe.publish(self.channel, json.dumps({"origin": self.worker_id, "user": user_id, "company": company_id}))
+            await pipe.execute()
+
+    async def publish_user_changed(self, user_id: str):
+        await self.client.publish(
+            self.channel, json.dumps({"origin": self.worker_id, "kind": "user", "user": user_id})
+        )
+
+    async def publish_master_changed(self, company_id: str, collection: str, doc_ids: List[str]):
+        await self.client.publish(self.channel, json.dumps({
+            "origin": self.worker_id, "kind": "master",
+            "company": company_id, "collection": collection, "ids": doc_ids
+        }))
+
+    async def listen(self, on_invalidate, on_user_changed, on_master_changed):
+        while True:
+            try:
+                pubsub = self.client.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    if event.get("origin") == self.worker_id:
+                        continue
+                    kind = event.get("kind")
+                    if kind == "user":
+                        on_user_changed(event["user"])
+                    elif kind == "master":
+                        on_master_changed(event["company"], event["collection"], event["ids"])
+                    else:
+                        on_invalidate(event.get("user"), event.get("company"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # L1 entries still expire on their own; keep trying to resubscribe
+                logger.exception("Permission invalidation listener failed; resubscribing")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        await self.client.aclose()
+
+class TieredPermissionCache:
+    """
+    Permission masks per (user, company): the in-process PermissionCache (L1)
+    in front of a shared backend (L2). Writes go to both; invalidations clear
+    the local L1, bump the L2 generation and are broadcast to other workers.
+    """
+
+    def __init__(self, l1: PermissionCache, backend: PermissionCacheBackend, ttl: float):
+        self.l1 = l1
+        self.backend = backend
+        self.ttl = ttl
+        self._listener: Optional[asyncio.Task] = None
+        self._invalidation_listeners: List[Callable[[Optional[str], Optional[str]], None]] = []
+        self._user_listeners: List[Callable[[str], None]] = []
+        self._master_listeners: List[Callable[[str, str, List[str]], None]] = []
+
+    async def lookup(self, user_id: Any, company_id: Any) -> Tuple[Optional[int], LoadToken]:
+        """Returns (permission mask or None, token to pass to store() after loading on a miss)."""
+        user_id, company_id = str(user_id), str(company_id)
+        epoch = self.l1.begin_load()
+        permissions = self.l1.get_permissions(user_id, company_id)
+        if permissions is not None:
+            return permissions, LoadToken(epoch)
+
+        permissions, generation = await self.backend.get(user_id, company_id)
+        if permissions is not None:
+            self.l1.set_permissions(user_id, company_id, permissions, epoch)
+        return permissions, LoadToken(epoch, generation)
+
+    async def store(self, user_id: Any, company_id: Any, permissions: int, token: LoadToken):
+        user_id, company_id = str(user_id), str(company_id)
+        self.l1.set_permissions(user_id, company_id, permissions, token.epoch)
+        await self.backend.set(user_id, company_id, permissions, token.generation, self.ttl)
+
+    async def invalidate(self, user_id: Any, company_id: Optional[Any] = None):
+        """Invalidate a user in one company, or in every company when company_id is None."""
+        self.l1.invalidate(str(user_id), str(company_id) if company_id else None)
+        await self.backend.invalidate(str(user_id), str(company_id) if company_id else None)
+
+    async def invalidate_all_for_company(self, company_id: Any):
+        self.l1.invalidate_all_for_company(str(company_id))
+        await self.backend.invalidate(None, str(company_id))
+
+    def add_invalidation_listener(self, listener: Callable[[Optional[str], Optional[str]], None]):
+        """Also calls listener(user_id, company_id) for invalidations from other workers."""
+        self._invalidation_listeners.append(listener)
+
+    def add_user_listener(self, listener: Callable[[str], None]):
+        """Calls listener(user_id) when another worker reports a User change."""
+        self._user_listeners.append(listener)
+
+    async def user_changed(self, user_id: Any):
+        """Broadcasts a User change; the caller handles its own worker's caches."""
+        await self.backend.publish_user_changed(str(user_id))
+
+    def _on_remote_user_changed(self, user_id: str):
+        for listener in self._user_listeners:
+            listener(user_id)
+
+    def add_master_listener(self, listener: Callable[[str, str, List[str]], None]):
+        """Calls listener(company_id, collection, doc_ids) when another worker writes master documents."""
+        self._master_listeners.append(listener)
+
+    async def master_changed(self, company_id: Any, collection: str, doc_ids: List[Any]):
+        """Broadcasts master document writes; the caller handles its own worker's caches."""
+        await self.backend.publish_master_changed(str(company_id), collection, [str(i) for i in doc_ids])
+
+    def _on_remote_master_changed(self, company_id: str, collection: str, doc_ids: List[str]):
+        for listener in self._master_listeners:
+            listener(company_id, collection, doc_ids)
+
+    def _on_remote_invalidate(self, user_id: Optional[str], company_id: Optional[str]):
+        if user_id:
+            self.l1.invalidate(user_id, company_id)
+        elif company_id:
+            self.l1.invalidate_all_for_company(company_id)
+        for listener in self._invalidation_listeners:
+            listener(user_id, company_id)
+
+    def start(self, purge_interval: float):
+        """Starts L1 background expiry and the invalidation listener (call from startup)."""
+        self.l1.start_expiry(purge_interval)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self.backend.listen(
+                self._on_remote_invalidate, self._on_remote_user_changed, self._on_remote_master_changed
+            ))
+
+    async def stop(self):
+        self.l1.stop_expiry()
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        await self.backend.close()
+
+    def stats(self):
+        return self.l1.stats()
+
+def build_backend() -> PermissionCacheBackend:
+    if settings.PERMISSION_CACHE_BACKEND == "redis":
+        if aioredis is None:
+            raise RuntimeError("PERMISSION_CACHE_BACKEND=redis requires the 'redis' package")
+        return RedisPermissionBackend(
+            aioredis.from_url(settings.REDIS_URL),
+            channel=settings.PERMISSION_CACHE_CHANNEL,
+            ttl=settings.PERMISSION_CACHE_TTL_SECONDS
+        )
+    return PermissionCacheBackend()
+
+# Global singleton instance
+permission_cache = TieredPermissionCache(
+    l1=PermissionCache(
+        max_entries=settings.PERMISSION_CACHE_MAX_ENTRIES,
+        ttl=settings.PERMISSION_CACHE_TTL_SECONDS
+    ),
+    backend=build_backend(),
+    ttl=settings.PERMISSION_CACHE_TTL_SECONDS
+)
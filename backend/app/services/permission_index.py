@@ -0,0 +1,106 @@
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set
+from pymongo.errors import DuplicateKeyError
+from ..core.config import settings
+from ..core.singleflight import SingleFlight
+from ..models.permission import Permission
+
+logger = logging.getLogger(__name__)
+
+class PermissionIndex:
+    """
+    The Permission catalog compiled into key -> bit. Bits are persisted on the
+    Permission documents and never reused, so a mask means the same thing in
+    every worker and across restarts. A set of permissions is an int with one
+    bit per key; a check is a single AND.
+
+    Permissions seeded while the app runs are picked up by resolve()/ensure(),
+    which reload the catalog on an unknown key at most once per reload_interval.
+    """
+
+    def __init__(self, reload_interval: float):
+        self.reload_interval = reload_interval
+        self._flags: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}
+        self._unknown: Set[str] = set()
+        self._loads = SingleFlight()
+        self._loaded_at: Optional[float] = None
+
+    async def load(self):
+        """Assigns bits to new permissions and compiles the index (call from startup)."""
+        await self._assign_bits()
+        permissions = await Permission.find({"bit": {"$ne": None}}).to_list()
+        self._flags = {p.key: 1 << p.bit for p in permissions}
+        self._keys = {p.bit: p.key for p in permissions}
+        # Keys still unknown after this load are warned about again
+        self._unknown = set()
+        self._loaded_at = time.monotonic()
+
+    async def reload(self):
+        """Reloads the catalog unless it was loaded less than reload_interval ago."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.reload_interval:
+            return
+        await self._loads.do("catalog", self.load)
+
+    async def ensure(self, keys: Iterable[str]):
+        """Reloads (rate limited) if any of keys has no bit yet, e.g. before mask_of()."""
+        if any(key not in self._flags for key in keys):
+            await self.reload()
+
+    async def resolve(self, key: str) -> int:
+        """Like flag(), but an unknown key first triggers a (rate limited) reload."""
+        if key not in self._flags:
+            await self.reload()
+        return self.flag(key)
+
+    async def _assign_bits(self):
+        collection = Permission.get_motor_collection()
+        while True:
+            permissions = await Permission.find_all().sort("_id").to_list()
+            next_bit = max((p.bit for p in permissions if p.bit is not None), default=-1) + 1
+            try:
+                for permission in permissions:
+                    if permission.bit is not None:
+                        continue
+                    await collection.update_one(
+                        {"_id": permission.id, "bit": None},
+                        {"$set": {"bit": next_bit}}
+                    )
+                    next_bit += 1
+                return
+            except DuplicateKeyError:
+                # Another worker assigned the same bit first; start over from its result
+                continue
+
+    def flag(self, key: str) -> int:
+        """The single-bit mask for a key, or 0 for keys not in the catalog."""
+        flag = self._flags.get(key)
+        if flag is None:
+            if key not in self._unknown:
+                self._unknown.add(key)
+                logger.warning("Permission %r is not in the catalog; it is not granted until it is", key)
+            return 0
+        return flag
+
+    def mask_of(self, keys: Iterable[str]) -> int:
+        mask = 0
+        for key in keys:
+            mask |= self.flag(key)
+        return mask
+
+    def keys_of(self, mask: int) -> Set[str]:
+        keys = set()
+        while mask:
+            low = mask & -mask
+            key = self._keys.get(low.bit_length() - 1)
+            if key is not None:
+                keys.add(key)
+            mask ^= low
+        return keys
+
+    def has(self, mask: int, key: str) -> bool:
+        flag = self.flag(key)
+        return flag != 0 and mask & flag == flag
+
+permission_index = PermissionIndex(reload_interval=settings.PERMISSION_INDEX_RELOAD_SECONDS)
@@ -0,0 +1,60 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+from beanie import PydanticObjectId
+from ..core.config import settings
+from ..core.singleflight import SingleFlight
+from ..models.permission_version import get_permission_version, bump_permission_version
+from .permission_cache import permission_cache
+
+class PermissionVersionTable:
+    """
+    In-process copy of the per-company permission versions, so checking a
+    token's permission claim is a dict lookup. Entries are re-read after
+    `ttl` seconds, which bounds how long another worker's bump can go unseen
+    when no invalidation broadcast reaches this one.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # company_id -> (version, monotonic time it must be re-read)
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._loads = SingleFlight()
+
+    async def current(self, company_id: Any) -> int:
+        company_id = str(company_id)
+        entry = self._versions.get(company_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return await self._loads.do(company_id, lambda: self._load(company_id))
+
+    async def _load(self, company_id: str) -> int:
+        version = await get_permission_version(PydanticObjectId(company_id))
+        return self._remember(company_id, version)
+
+    async def bump(self, company_id: Any) -> int:
+        """Call before invalidating the permission cache for a role or assignment change."""
+        version = await bump_permission_version(PydanticObjectId(str(company_id)))
+        return self._remember(str(company_id), version)
+
+    def _remember(self, company_id: str, version: int) -> int:
+        # Versions only grow: a load that read the counter before a concurrent
+        # bump must not move the table back and revalidate older tokens
+        entry = self._versions.get(company_id)
+        if entry is not None and entry[0] > version:
+            version = entry[0]
+        self._versions[company_id] = (version, time.monotonic() + self.ttl)
+        return version
+
+    def forget(self, user_id: Optional[str], company_id: Optional[str]):
+        """Remote invalidation hook: re-read the version on next use."""
+        if company_id:
+            self._versions.pop(company_id, None)
+        else:
+            self._versions.clear()
+
+    def clear(self):
+        self._versions.clear()
+
+# Global singleton instance
+permission_versions = PermissionVersionTable(ttl=settings.PERMISSION_VERSION_TTL_SECONDS)
+permission_cache.add_invalidation_listener(permission_versions.forget)
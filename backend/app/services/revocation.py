@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from beanie import PydanticObjectId
+from pymongo.errors import DuplicateKeyError
+from ..core.config import settings
+from ..models.token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Revocations written by other workers are picked up by time, so allow for clock skew between hosts
+SYNC_OVERLAP = timedelta(seconds=30)
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. No false negatives; false positives
+    at roughly `error_rate` once `capacity` keys have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def _hashes(key: str):
+        # Double hashing: two 64-bit halves of one digest give all k positions
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, key: str):
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        # Most absent keys miss on the first probe or two, so test as we go
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+class RevocationList:
+    """
+    Revoked token ids and refresh families. The revoked_tokens collection is
+    the source of truth; a per-process Bloom filter in front of it means the
+    common case (not revoked) is answered without I/O, and only filter hits
+    are confirmed against MongoDB.
+
+    Revocations from other workers reach the filter through a periodic
+    incremental sync; a periodic rebuild drops keys whose entries expired.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._synced_at: Optional[datetime] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self.confirmations = 0
+        self.false_positives = 0
+
+    async def revoke(
+        self, key: str, kind: str, expires_at: datetime, user_id: Optional[PydanticObjectId] = None
+    ):
+        """Revokes until expires_at, after which every token the key covers has expired anyway."""
+        try:
+            await RevokedToken.get_motor_collection().update_one(
+                {"key": key},
+                {"$setOnInsert": {
+                    "key": key, "kind": kind, "user_id": user_id,
+                    "revoked_at": datetime.utcnow(), "expires_at": expires_at
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # A concurrent revoke of the same key won the upsert
+            pass
+        self._bloom.add(key)
+
+    async def is_revoked(self, token_id: Optional[str], family: Optional[str] = None) -> bool:
+        bloom = self._bloom
+        if not ((token_id and token_id in bloom) or (family and family in bloom)):
+            return False
+
+        keys = [key for key in (token_id, family) if key and key in bloom]
+
+        self.confirmations += 1
+        doc = await RevokedToken.get_motor_collection().find_one(
+            {"key": {"$in": keys}, "expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1}
+        )
+        if doc is None:
+            self.false_positives += 1
+            return False
+        return True
+
+    async def load(self):
+        """Rebuilds the filter from every live revocation (call from startup)."""
+        started = datetime.utcnow()
+        collection = RevokedToken.get_motor_collection()
+        query = {"expires_at": {"$gt": started}}
+        live = await collection.count_documents(query)
+        # Grow with the list so the false-positive rate holds
+        bloom = BloomFilter(max(self.capacity, live * 2), self.error_rate)
+        async for doc in collection.find(query, {"key": 1, "_id": 0}):
+            bloom.add(doc["key"])
+        self._bloom = bloom
+        self._synced_at = started
+
+    async def sync(self):
+        """Adds revocations made since the last sync, including other workers'."""
+        if self._synced_at is None:
+            await self.load()
+            return
+        started = datetime.utcnow()
+        cursor = RevokedToken.get_motor_collection().find(
+            {"revoked_at": {"$gte": self._synced_at - SYNC_OVERLAP}}, {"key": 1, "_id": 0}
+        )
+        async for doc in cursor:
+            if doc["key"] not in self._bloom:
+                self._bloom.add(doc["key"])
+        self._synced_at = started
+
+    async def _sync_loop(self, interval: float, rebuild_interval: float):
+        next_rebuild = time.monotonic() + rebuild_interval
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if time.monotonic() >= next_rebuild:
+                    await self.load()
+                    next_rebuild = time.monotonic() + rebuild_interval
+                else:
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Revocation list sync failed; retrying next interval")
+
+    def start(self, interval: float, rebuild_interval: float):
+        """Starts background sync on the running event loop (call from startup, after load)."""
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop(interval, rebuild_interval))
+
+    def stop(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": self._bloom.count,
+            "bits": self._bloom.size,
+            "hashes": self._bloom.hashes,
+            "confirmations": self.confirmations,
+            "false_positives": self.false_positives,
+        }
+
+# Global singleton instance
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE
+)
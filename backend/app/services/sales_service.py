@@ -1,43 +1,151 @@
-from typing import List, Optional
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from fastapi import HTTPException, status
 from beanie import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel
+from pymongo.errors import BulkWriteError
+from ..models.base import TenantDocument
 from ..models.sales import (
     Quotation, SalesOrder, Invoice, SalesItem, 
-    QuotationStatus, SalesOrderStatus, InvoiceStatus
+    QuotationStatus, SalesOrderStatus, InvoiceStatus,
+    OPEN_QUOTATION_STATUSES, UNPAID_INVOICE_STATUSES, BILLED_INVOICE_STATUSES
 )
-from ..models.sequence import get_next_sequence_number
+from ..models.company_stats import increment_company_stats, month_key
+from ..models.sequence import get_next_sequence_number, reserve_sequence_block, format_sequence_number
 from ..models.item import Item
 from ..models.tax import Tax
 from ..models.customer import Customer
+from ..repositories.base import master_loads
 from ..repositories.sales_repos import quotation_repo, sales_order_repo, invoice_repo
-from ..schemas.sales import QuotationCreate, SalesOrderCreate, InvoiceCreate, SalesItemBase
+from .cache import master_cache
+from .dashboard_service import dashboard_service
+from ..schemas.sales import (
+    QuotationCreate, SalesOrderCreate, InvoiceCreate, SalesItemBase,
+    BulkCreateResult, BulkCreateResponse
+)
+
+def quotation_stats(quotation: Optional[Quotation]) -> Dict[str, float]:
+    """What one quotation contributes to CompanyStats."""
+    if quotation is None or not quotation.is_active or quotation.status not in OPEN_QUOTATION_STATUSES:
+        return {}
+    return {"open_quotations": 1}
+
+def invoice_stats(invoice: Optional[Invoice]) -> Dict[str, float]:
+    """What one invoice contributes to CompanyStats."""
+    if invoice is None or not invoice.is_active:
+        return {}
+    stats = {}
+    if invoice.status in UNPAID_INVOICE_STATUSES:
+        stats["unpaid_invoice_total"] = invoice.grand_total
+    if invoice.status in BILLED_INVOICE_STATUSES and invoice.issued_at:
+        stats[f"revenue_by_month.{month_key(invoice.issued_at)}"] = invoice.grand_total
+    return stats
 
 class SalesService:
-    async def _calculate_totals(self, items_in: List[SalesItemBase], company_id: PydanticObjectId):
+    async def _load_masters(
+        self, items_in: List[SalesItemBase], company_id: PydanticObjectId
+    ) -> Tuple[Dict[PydanticObjectId, Item], Dict[PydanticObjectId, Tax]]:
         """
-        Calculates line totals and tax totals for a list of items.
+        Loads every distinct item and tax referenced by the lines, from the
+        master cache where possible and otherwise with one tenant-scoped $in
+        query per collection. References that are not found are left out.
+        """
+        item_ids = list({line.item_id for line in items_in})
+        tax_ids = list({tax_id for line in items_in for tax_id in line.tax_ids})
+
+        # Serve what we can from the master cache and only query the misses
+        item_map, item_misses = master_cache.get_many(company_id, Item.__name__, item_ids)
+        tax_map, tax_misses = master_cache.get_many(company_id, Tax.__name__, tax_ids)
+
+        queries = []
+        if item_misses:
+            queries.append(self._fetch_masters(Item, item_misses, company_id))
+        if tax_misses:
+            queries.append(self._fetch_masters(Tax, tax_misses, company_id))
+
+        for docs in await asyncio.gather(*queries):
+            for doc in docs:
+                if isinstance(doc, Item):
+                    item_map[doc.id] = doc
+                else:
+                    tax_map[doc.id] = doc
+
+        return item_map, tax_map
+
+    async def _fetch_masters(self, model: Type[TenantDocument], ids: List[PydanticObjectId], company_id: PydanticObjectId) -> list:
+        """
+        One $in query for the given ids, shared with concurrent requests that
+        missed the cache for exactly the same set (e.g. a burst of identical orders).
+        """
+        epoch = master_cache.begin_load()
+
+        async def load():
+            docs = await model.find(In(model.id, ids), model.company_id == company_id).to_list()
+            for doc in docs:
+                master_cache.set(company_id, model.__name__, doc, epoch)
+            return docs
+
+        key = (str(company_id), model.__name__, tuple(sorted(str(i) for i in ids)), epoch)
+        return await master_loads.do(key, load)
+
+    def _missing_masters(
+        self,
+        items_in: List[SalesItemBase],
+        item_map: Dict[PydanticObjectId, Item],
+        tax_map: Dict[PydanticObjectId, Tax]
+    ) -> Optional[str]:
+        """Returns an error message if any line references an unknown item or tax."""
+        missing_items = {str(line.item_id) for line in items_in if line.item_id not in item_map}
+        if missing_items:
+            return f"Items not found in active company: {', '.join(sorted(missing_items))}"
+        missing_taxes = {
+            str(tax_id) for line in items_in for tax_id in line.tax_ids if tax_id not in tax_map
+        }
+        if missing_taxes:
+            return f"Taxes not found in active company: {', '.join(sorted(missing_taxes))}"
+        return None
+
+    async def _resolve_masters(
+        self, items_in: List[SalesItemBase], company_id: PydanticObjectId
+    ) -> Tuple[Dict[PydanticObjectId, Item], Dict[PydanticObjectId, Tax]]:
+        """
+        Same as _load_masters, but raises 400 if any reference is missing or
+        belongs to another company.
+        """
+        item_map, tax_map = await self._load_masters(items_in, company_id)
+        error = self._missing_masters(items_in, item_map, tax_map)
+        if error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+        return item_map, tax_map
+
+    def _compute_lines(
+        self,
+        items_in: List[SalesItemBase],
+        item_map: Dict[PydanticObjectId, Item],
+        tax_map: Dict[PydanticObjectId, Tax]
+    ):
+        """
+        Computes line totals and tax totals from already resolved masters.
         """
         processed_items = []
         subtotal = 0.0
         tax_total = 0.0
 
         for item_data in items_in:
-            # Fetch item master for name and unit
-            item_master = await Item.get(item_data.item_id)
-            if not item_master:
-                continue
-            
+            item_master = item_map[item_data.item_id]
+
             # Subtotal for this line
             line_subtotal = item_data.qty * item_data.price
-            
+
             # Calculate taxes
             line_tax_amount = 0.0
             for tax_id in item_data.tax_ids:
-                tax_master = await Tax.get(tax_id)
-                if tax_master:
-                    line_tax_amount += (line_subtotal * (tax_master.rate / 100))
-            
+                line_tax_amount += (line_subtotal * (tax_map[tax_id].rate / 100))
+
             line_total = line_subtotal + line_tax_amount
-            
+
             processed_items.append(SalesItem(
                 item_id=item_data.item_id,
                 name=item_master.name,
@@ -48,12 +156,19 @@ class SalesService:
                 tax_amount=line_tax_amount,
                 line_total=line_total
             ))
-            
+
             subtotal += line_subtotal
             tax_total += line_tax_amount
 
         return processed_items, subtotal, tax_total, (subtotal + tax_total)
 
+    async def _calculate_totals(self, items_in: List[SalesItemBase], company_id: PydanticObjectId):
+        """
+        Calculates line totals and tax totals for a list of items.
+        """
+        item_map, tax_map = await self._resolve_masters(items_in, company_id)
+        return self._compute_lines(items_in, item_map, tax_map)
+
     async def create_quotation(self, q_in: QuotationCreate, company_id: PydanticObjectId) -> Quotation:
         customer = await Customer.get(q_in.customer_id)
         if not customer:
@@ -76,6 +191,7 @@ class SalesService:
             notes=q_in.notes
         )
         await quotation.insert()
+        await self._record_stats(company_id, {}, quotation_stats(quotation))
         return quotation
 
     async def create_sales_order(self, so_in: SalesOrderCreate, company_id: PydanticObjectId) -> SalesOrder:
@@ -127,4 +243,120 @@ class SalesService:
         await invoice.insert()
         return invoice
 
+    async def accept_quotation(self, id: PydanticObjectId, company_id: PydanticObjectId) -> Optional[Quotation]:
+        previous, quotation = await quotation_repo.set_status(id, QuotationStatus.ACCEPTED)
+        if previous is not None:
+            await self._record_stats(company_id, quotation_stats(previous), quotation_stats(quotation))
+        return quotation
+
+    async def issue_invoice(self, id: PydanticObjectId, company_id: PydanticObjectId) -> Optional[Invoice]:
+        previous, invoice = await invoice_repo.set_status(
+            id, InvoiceStatus.ISSUED, {"issued_at": datetime.utcnow()}
+        )
+        if previous is not None:
+            await self._record_stats(company_id, invoice_stats(previous), invoice_stats(invoice))
+        return invoice
+
+    async def _record_stats(
+        self, company_id: PydanticObjectId, before: Dict[str, float], after: Dict[str, float]
+    ):
+        """Applies the change in a document's CompanyStats contribution."""
+        increments = {key: after.get(key, 0) - before.get(key, 0) for key in before.keys() | after.keys()}
+        if any(increments.values()):
+            await increment_company_stats(company_id, increments)
+            dashboard_service.invalidate(company_id)
+
+    async def _bulk_create(
+        self,
+        docs_in: List[BaseModel],
+        company_id: PydanticObjectId,
+        model: Type[TenantDocument],
+        entity: str,
+        prefix: str,
+        number_field: str,
+        extra_fields: Callable[[BaseModel], Dict[str, Any]]
+    ) -> BulkCreateResponse:
+        """
+        Creates a batch of sales documents with a fixed number of round trips:
+        one query per master collection, one sequence reservation and one
+        unordered insert_many. Failures are reported per document.
+        """
+        results: List[Optional[BulkCreateResult]] = [None] * len(docs_in)
+
+        all_lines = [line for doc in docs_in for line in doc.items]
+        customer_ids = list({doc.customer_id for doc in docs_in})
+        customers, (item_map, tax_map) = await asyncio.gather(
+            Customer.find(In(Customer.id, customer_ids), Customer.company_id == company_id).to_list(),
+            self._load_masters(all_lines, company_id)
+        )
+        customer_map = {c.id: c for c in customers}
+
+        # Validate and price every document before reserving any numbers
+        valid = []
+        for index, doc_in in enumerate(docs_in):
+            customer = customer_map.get(doc_in.customer_id)
+            error = "Customer not found" if not customer else self._missing_masters(doc_in.items, item_map, tax_map)
+            if error:
+                results[index] = BulkCreateResult(index=index, success=False, error=error)
+                continue
+            valid.append((index, doc_in, customer, self._compute_lines(doc_in.items, item_map, tax_map)))
+
+        documents = []
+        if valid:
+            first_value, seq_prefix, padding = await reserve_sequence_block(company_id, entity, prefix, len(valid))
+            for offset, (index, doc_in, customer, totals) in enumerate(valid):
+                items, subtotal, tax_total, grand_total = totals
+                documents.append((index, model(
+                    id=PydanticObjectId(),
+                    company_id=company_id,
+                    customer_id=doc_in.customer_id,
+                    customer_name=customer.name,
+                    items=items,
+                    subtotal=subtotal,
+                    tax_total=tax_total,
+                    grand_total=grand_total,
+                    **{number_field: format_sequence_number(seq_prefix, padding, first_value + offset)},
+                    **extra_fields(doc_in)
+                )))
+
+        failed_positions: Dict[int, str] = {}
+        if documents:
+            try:
+                await model.insert_many([doc for _, doc in documents], ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed_positions[write_error["index"]] = write_error.get("errmsg", "Write failed")
+
+        for position, (index, doc) in enumerate(documents):
+            if position in failed_positions:
+                results[index] = BulkCreateResult(index=index, success=False, error=failed_positions[position])
+            else:
+                results[index] = BulkCreateResult(
+                    index=index, success=True, id=doc.id, number=getattr(doc, number_field)
+                )
+
+        created = sum(1 for r in results if r.success)
+        return BulkCreateResponse(created=created, failed=len(results) - created, results=results)
+
+    async def bulk_create_quotations(self, docs_in: List[QuotationCreate], company_id: PydanticObjectId) -> BulkCreateResponse:
+        response = await self._bulk_create(
+            docs_in, company_id, Quotation, "quotation", "QT-", "quote_number",
+            lambda q_in: {"valid_until": q_in.valid_until, "notes": q_in.notes}
+        )
+        # New quotations are drafts, so each one created is open
+        await self._record_stats(company_id, {}, {"open_quotations": response.created})
+        return response
+
+    async def bulk_create_sales_orders(self, docs_in: List[SalesOrderCreate], company_id: PydanticObjectId) -> BulkCreateResponse:
+        return await self._bulk_create(
+            docs_in, company_id, SalesOrder, "sales_order", "SO-", "order_number",
+            lambda so_in: {"quotation_id": so_in.quotation_id, "notes": so_in.notes}
+        )
+
+    async def bulk_create_invoices(self, docs_in: List[InvoiceCreate], company_id: PydanticObjectId) -> BulkCreateResponse:
+        return await self._bulk_create(
+            docs_in, company_id, Invoice, "invoice", "INV-", "invoice_number",
+            lambda inv_in: {"sales_order_id": inv_in.sales_order_id, "due_date": inv_in.due_date, "notes": inv_in.notes}
+        )
+
 sales_service = SalesService()
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.models.customer import Customer
+from app.models.vendor import Vendor
+from app.models.item import Item
+from app.models.category import ItemCategory
+from app.repositories.master_repos import customer_repo, vendor_repo, item_repo, category_repo
+
+BATCH_SIZE = 1000
+
+async def backfill(repo):
+    """Recomputes the normalized search fields on every document of a master collection."""
+    collection = repo.model.get_motor_collection()
+    sources = {source: 1 for source in repo.normalized_fields}
+    updated = 0
+    ops = []
+
+    async for doc in collection.find({}, sources):
+        changes = repo._normalize({source: doc.get(source) for source in repo.normalized_fields})
+        targets = {target: changes[target] for target, _ in repo.normalized_fields.values()}
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": targets}))
+        if len(ops) >= BATCH_SIZE:
+            result = await collection.bulk_write(ops, ordered=False)
+            updated += result.modified_count
+            ops = []
+
+    if ops:
+        result = await collection.bulk_write(ops, ordered=False)
+        updated += result.modified_count
+
+    print(f"✅ {repo.model.get_collection_name()}: {updated} documents updated")
+
+async def report_duplicates(repo) -> int:
+    """Lists values that would violate the per-company unique indexes."""
+    collection = repo.model.get_motor_collection()
+    conflicts = 0
+    for field in repo.unique_fields:
+        pipeline = [
+            {"$match": {field: {"$type": "string"}}},
+            {"$group": {"_id": {"company_id": "$company_id", "value": f"${field}"},
+                        "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]
+        async for group in collection.aggregate(pipeline):
+            conflicts += 1
+            ids = ", ".join(str(i) for i in group["ids"])
+            print(f"⚠️  {repo.model.get_collection_name()}.{field} = {group['_id']['value']!r} "
+                  f"(company {group['_id']['company_id']}): {ids}")
+    return conflicts
+
+async def main():
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    # Runs before the unique indexes exist, so don't try to create them here
+    await init_beanie(
+        database=client[settings.DATABASE_NAME],
+        document_models=[Customer, Vendor, Item, ItemCategory],
+        skip_indexes=True
+    )
+    repos = [customer_repo, vendor_repo, item_repo, category_repo]
+    for repo in repos:
+        await backfill(repo)
+
+    conflicts = 0
+    for repo in repos:
+        conflicts += await report_duplicates(repo)
+    if conflicts:
+        print(f"\n❌ {conflicts} duplicate value(s) must be resolved before the unique indexes can be built")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie, PydanticObjectId
+from app.core.config import settings
+from app.models.customer import Customer
+from app.models.item import Item
+from app.models.tax import Tax
+from app.models.sequence import Sequence
+from app.models.sales import Invoice
+from app.services.sales_service import sales_service
+from app.schemas.sales import InvoiceCreate, SalesItemBase, MAX_BULK_DOCUMENTS
+
+TOTAL_INVOICES = 2000
+LINES_PER_INVOICE = 5
+
+async def main():
+    # Throwaway database so generated invoice numbers never clash with real data
+    db_name = f"{settings.DATABASE_NAME}_bulk_bench"
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(db_name)
+    await init_beanie(
+        database=client[db_name],
+        document_models=[Customer, Item, Tax, Sequence, Invoice]
+    )
+
+    cid = PydanticObjectId()
+    customers = [Customer(company_id=cid, name=f"Bench Customer {i}") for i in range(50)]
+    await Customer.insert_many(customers)
+    customers = await Customer.find(Customer.company_id == cid).to_list()
+    await Tax(company_id=cid, name="GST 18%", rate=18, tax_type="GST").insert()
+    tax = await Tax.find_one(Tax.company_id == cid)
+    await Item.insert_many([
+        Item(company_id=cid, name=f"Bench Item {i}", item_type="PRODUCT", unit="PCS", sale_price=100)
+        for i in range(100)
+    ])
+    items = await Item.find(Item.company_id == cid).to_list()
+
+    docs = [
+        InvoiceCreate(
+            customer_id=customers[i % len(customers)].id,
+            items=[
+                SalesItemBase(item_id=items[(i + j) % len(items)].id, qty=1, price=100, tax_ids=[tax.id])
+                for j in range(LINES_PER_INVOICE)
+            ]
+        )
+        for i in range(TOTAL_INVOICES)
+    ]
+
+    print(f"🚀 {TOTAL_INVOICES} invoices x {LINES_PER_INVOICE} lines")
+
+    start = time.perf_counter()
+    for doc in docs:
+        await sales_service.create_invoice(doc, cid)
+    loop_elapsed = time.perf_counter() - start
+    print(f"   single create loop: {loop_elapsed:.2f}s ({TOTAL_INVOICES / loop_elapsed:.0f} invoices/s)")
+
+    start = time.perf_counter()
+    failed = 0
+    for i in range(0, TOTAL_INVOICES, MAX_BULK_DOCUMENTS):
+        result = await sales_service.bulk_create_invoices(docs[i:i + MAX_BULK_DOCUMENTS], cid)
+        failed += result.failed
+    bulk_elapsed = time.perf_counter() - start
+    print(f"   bulk create:        {bulk_elapsed:.2f}s ({TOTAL_INVOICES / bulk_elapsed:.0f} invoices/s), failed={failed}")
+    print(f"📊 Speedup: {loop_elapsed / bulk_elapsed:.1f}x")
+
+    await client.drop_database(db_name)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+import gzip
+import json
+import os
+import sys
+import time
+import statistics
+from datetime import datetime, timedelta
+from typing import List
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.api.responses import ORJSONResponse
+from app.schemas.item import ItemOut
+from app.schemas.sales import InvoiceSummary
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROWS = 1000
+RUNS = 20
+
+def invoice_rows(n: int) -> List[dict]:
+    """Raw documents shaped like GET /invoices (InvoiceSummary)."""
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "invoice_number": f"INV-{i:05d}",
+            "customer_id": ObjectId(),
+            "customer_name": f"Customer {i % 250}",
+            "grand_total": 1180.0 + i,
+            "status": "ISSUED" if i % 3 else "DRAFT",
+            "due_date": now + timedelta(days=30),
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+
+def item_rows(n: int) -> List[dict]:
+    """Raw documents shaped like GET /items (ItemOut)."""
+    now = datetime.utcnow()
+    company_id = ObjectId()
+    taxes = [ObjectId(), ObjectId()]
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Item {i:05d}",
+            "item_type": "PRODUCT",
+            "category_id": ObjectId(),
+            "sku": f"SKU-{i:05d}",
+            "unit": "PCS",
+            "sale_price": 100.0 + i,
+            "purchase_price": 80.0 + i,
+            "tax_ids": taxes,
+            "track_inventory": True,
+            "company_id": company_id,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(n)
+    ]
+
+def timed(fn) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def bench(label: str, schema, rows: List[dict]):
+    adapter = TypeAdapter(List[schema])
+    models = adapter.validate_python(rows)
+
+    # Previous default: response_model serialization, then stdlib json via JSONResponse
+    def stdlib():
+        return JSONResponse(jsonable_encoder(adapter.dump_python(models, mode="json", by_alias=True))).body
+
+    def orjson_model():
+        return ORJSONResponse(adapter.dump_python(models, mode="json", by_alias=True)).body
+
+    def orjson_raw():
+        return ORJSONResponse(rows).body
+
+    body = orjson_raw()
+    assert json.loads(stdlib()) == json.loads(body), "payloads differ"
+
+    print(f"\n📊 {label}: {len(rows)} rows, {len(body) / 1024:.0f} KiB")
+    print(f"   stdlib JSONResponse + jsonable_encoder: {timed(stdlib):8.2f} ms")
+    print(f"   ORJSONResponse (response_model):        {timed(orjson_model):8.2f} ms")
+    print(f"   ORJSONResponse (raw rows):              {timed(orjson_raw):8.2f} ms")
+
+    gzip_ms = timed(lambda: gzip.compress(body, compresslevel=9))
+    print(f"   gzip:   {len(gzip.compress(body, compresslevel=9)) / 1024:6.0f} KiB in {gzip_ms:6.2f} ms")
+    if brotli is not None:
+        # brotli-asgi's default quality
+        brotli_ms = timed(lambda: brotli.compress(body, quality=4))
+        print(f"   brotli: {len(brotli.compress(body, quality=4)) / 1024:6.0f} KiB in {brotli_ms:6.2f} ms")
+
+def main():
+    bench("GET /invoices", InvoiceSummary, invoice_rows(ROWS))
+    bench("GET /items", ItemOut, item_rows(ROWS))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import statistics
+from typing import List
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie, PydanticObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.core.config import settings
+from app.core.tenant import set_tenant_id
+from app.models.customer import Customer
+from app.repositories.master_repos import customer_repo
+from app.schemas.customer import CustomerOut
+from app.api.responses import RawJSONResponse
+
+PAGE_SIZE = 1000
+PAGES = 10
+RUNS = 5
+
+async def validated_page(adapter, cursor):
+    """What list endpoints did before: Beanie documents -> response_model -> JSON."""
+    page = await customer_repo.list_page(limit=PAGE_SIZE, cursor=cursor)
+    out = adapter.validate_python(page.items, from_attributes=True)
+    body = json.dumps(jsonable_encoder(out, by_alias=True)).encode()
+    return page, body
+
+async def raw_page(adapter, cursor):
+    page = await customer_repo.list_page(limit=PAGE_SIZE, cursor=cursor, projection=CustomerOut, raw=True)
+    body = RawJSONResponse(page.items).body
+    return page, body
+
+async def cpu_per_thousand(fn, adapter) -> float:
+    """Median CPU milliseconds per 1,000 rows, walking PAGES pages per run."""
+    samples = []
+    for _ in range(RUNS):
+        cursor = None
+        rows = 0
+        start = time.process_time()
+        for _ in range(PAGES):
+            page, _ = await fn(adapter, cursor)
+            rows += len(page.items)
+            cursor = page.next_cursor
+        samples.append((time.process_time() - start) * 1000 / (rows / 1000))
+    return statistics.median(samples)
+
+async def main():
+    # Throwaway database so the benchmark never touches real tenants
+    db_name = f"{settings.DATABASE_NAME}_serialization_bench"
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(db_name)
+    await init_beanie(database=client[db_name], document_models=[Customer])
+
+    cid = PydanticObjectId()
+    set_tenant_id(cid)
+    total = PAGE_SIZE * PAGES
+    print(f"🌱 Seeding {total} customers...")
+    await Customer.insert_many([
+        Customer(
+            company_id=cid,
+            name=f"Customer {i:06d}",
+            email=f"customer{i}@example.com",
+            phone="+91 98765 43210",
+            gst_number=f"29ABCDE{i:04d}F1Z5",
+            billing_address={"line1": f"{i} Market Road", "city": "Bengaluru", "pincode": "560001"},
+        )
+        for i in range(total)
+    ])
+
+    adapter = TypeAdapter(List[CustomerOut])
+    _, validated_body = await validated_page(adapter, None)
+    _, raw_body = await raw_page(adapter, None)
+
+    validated_ms = await cpu_per_thousand(validated_page, adapter)
+    raw_ms = await cpu_per_thousand(raw_page, adapter)
+
+    print(f"📊 CPU time per 1,000 rows ({PAGES} pages of {PAGE_SIZE}, median of {RUNS} runs)")
+    print(f"   Beanie + response_model: {validated_ms:8.2f} ms")
+    print(f"   raw Motor dicts:         {raw_ms:8.2f} ms")
+    print(f"   speedup:                 {validated_ms / raw_ms:8.2f}x")
+    print(f"   same payload:            {json.loads(validated_body) == json.loads(raw_body)}")
+
+    await client.drop_database(db_name)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+import statistics
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password, verify_password_async
+
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.005
+
+
+async def legacy_login(password_hash: str):
+    """The previous handler body: bcrypt runs on the event loop."""
+    return verify_password(PASSWORD, password_hash)
+
+
+async def pooled_login(password_hash: str):
+    return await verify_password_async(PASSWORD, password_hash)
+
+
+async def probe(latencies, stop: asyncio.Event):
+    """Stands in for a cheap concurrent request: how late does it get scheduled?"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        latencies.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def burst(login, password_hash: str, logins: int):
+    latencies = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(latencies, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login(password_hash) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await prober
+    assert all(results)
+    latencies.sort()
+    return {
+        "burst_s": elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1] if len(latencies) > 1 else latencies[0],
+        "max": latencies[-1],
+        "probes": len(latencies),
+    }
+
+
+async def main(logins: int):
+    password_hash = get_password_hash(PASSWORD)
+    print(f"📊 {logins}-login burst, bcrypt cost {settings.BCRYPT_ROUNDS}, "
+          f"{settings.PASSWORD_HASH_WORKERS} hash threads")
+    print(f"{'':>16} | {'burst s':>8} | {'probe p50 ms':>12} | {'probe p99 ms':>12} | {'probe max ms':>12} | probes")
+    print("-" * 84)
+    for label, login in (("on event loop", legacy_login), ("thread pool", pooled_login)):
+        r = await burst(login, password_hash, logins)
+        print(f"{label:>16} | {r['burst_s']:>8.2f} | {r['p50']:>12.1f} | {r['p99']:>12.1f} | "
+              f"{r['max']:>12.1f} | {r['probes']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event-loop latency seen by other requests during a login burst")
+    parser.add_argument("--logins", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
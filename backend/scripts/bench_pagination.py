@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+import time
+import statistics
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie, PydanticObjectId
+from app.core.config import settings
+from app.core.tenant import set_tenant_id
+from app.models.customer import Customer
+from app.repositories.master_repos import customer_repo
+
+PAGE_SIZE = 100
+TARGET_PAGE = 1000
+TOTAL_DOCS = PAGE_SIZE * (TARGET_PAGE + 10)
+RUNS = 5
+
+async def timed(fn):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        page = await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), page
+
+async def main():
+    # Throwaway database; seeding ~100k customers is not something to do to a real tenant
+    db_name = f"{settings.DATABASE_NAME}_pagination_bench"
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(db_name)
+    await init_beanie(database=client[db_name], document_models=[Customer])
+    await Customer.get_motor_collection().create_index([("company_id", 1), ("is_active", 1), ("_id", 1)])
+
+    cid = PydanticObjectId()
+    set_tenant_id(cid)
+
+    print(f"🌱 Seeding {TOTAL_DOCS} customers...")
+    batch = 10_000
+    for start in range(0, TOTAL_DOCS, batch):
+        await Customer.insert_many([
+            Customer(company_id=cid, name=f"Customer {i:07d}")
+            for i in range(start, min(start + batch, TOTAL_DOCS))
+        ])
+
+    # Walk cursors up to the page before the target (not timed)
+    cursor = None
+    for _ in range(TARGET_PAGE - 1):
+        page = await customer_repo.list_page(limit=PAGE_SIZE, cursor=cursor)
+        cursor = page.next_cursor
+
+    skip_ms, skip_page = await timed(
+        lambda: customer_repo.list_page(limit=PAGE_SIZE, skip=PAGE_SIZE * (TARGET_PAGE - 1))
+    )
+    keyset_ms, keyset_page = await timed(
+        lambda: customer_repo.list_page(limit=PAGE_SIZE, cursor=cursor)
+    )
+
+    same = [c.id for c in skip_page.items] == [c.id for c in keyset_page.items]
+    print(f"📊 Page {TARGET_PAGE} (size {PAGE_SIZE}) over {TOTAL_DOCS} documents")
+    print(f"   skip/limit: {skip_ms:8.2f} ms")
+    print(f"   keyset:     {keyset_ms:8.2f} ms")
+    print(f"   same rows:  {same}")
+
+    await client.drop_database(db_name)
+
+if __name__ == "__main__":
+    asyncio.run(main())
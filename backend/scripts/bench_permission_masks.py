@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.permission_index import PermissionIndex
+
+MODULES = ["customers", "vendors", "items", "categories", "taxes", "price_lists",
+           "quotations", "sales_orders", "invoices", "credit_notes", "roles", "users"]
+ACTIONS = ["view", "create", "edit", "delete", "export", "import"]
+CACHE_ENTRIES = 10_000
+ROLES_PER_USER = 4
+KEYS_PER_ROLE = 30
+CHECKS = 1_000_000
+
+
+class CheckerState:
+    """The state app.api.deps.PermissionChecker keeps (importing it needs FastAPI)."""
+    __slots__ = ("_flag",)
+
+    def __init__(self, flag):
+        self._flag = flag
+
+
+def build_index(keys):
+    index = PermissionIndex(reload_interval=30)
+    index._flags = {key: 1 << bit for bit, key in enumerate(keys)}
+    index._keys = {bit: key for bit, key in enumerate(keys)}
+    return index
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    cache = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, size
+
+
+def main():
+    keys = [f"{module}.{action}" for module in MODULES for action in ACTIONS]
+    index = build_index(keys)
+    rng = random.Random(42)
+    roles = [rng.sample(keys, KEYS_PER_ROLE) for _ in range(50)]
+    users = [rng.sample(roles, ROLES_PER_USER) for _ in range(CACHE_ENTRIES)]
+
+    # Cache entries as they were (sets of key strings decoded per entry, as from JSON/Redis)
+    def set_cache():
+        cache = {}
+        for i, user_roles in enumerate(users):
+            permissions = set()
+            for role in user_roles:
+                permissions.update(key.encode().decode() for key in role)
+            cache[i] = permissions
+        return cache
+
+    def mask_cache():
+        cache = {}
+        for i, user_roles in enumerate(users):
+            mask = 0
+            for role in user_roles:
+                mask |= index.mask_of(role)
+            cache[i] = mask
+        return cache
+
+    sets, set_bytes = measure_memory(set_cache)
+    masks, mask_bytes = measure_memory(mask_cache)
+
+    required = [rng.choice(keys) for _ in range(1000)]
+    entries = [rng.randrange(CACHE_ENTRIES) for _ in range(1000)]
+
+    start = time.perf_counter()
+    for n in range(CHECKS):
+        _ = required[n % 1000] in sets[entries[n % 1000]]
+    set_ns = (time.perf_counter() - start) * 1e9 / CHECKS
+
+    # PermissionChecker's per-request path: its flag is resolved once, then only the AND runs
+    checkers = [CheckerState(index.flag(key)) for key in required]
+    start = time.perf_counter()
+    for n in range(CHECKS):
+        flag = checkers[n % 1000]._flag
+        _ = flag and masks[entries[n % 1000]] & flag == flag
+    mask_ns = (time.perf_counter() - start) * 1e9 / CHECKS
+
+    start = time.perf_counter()
+    for n in range(CHECKS):
+        _ = index.has(masks[entries[n % 1000]], required[n % 1000])
+    has_ns = (time.perf_counter() - start) * 1e9 / CHECKS
+
+    assert all(
+        (required[i] in sets[entries[i]]) == index.has(masks[entries[i]], required[i])
+        for i in range(1000)
+    ), "set and mask checks disagree"
+
+    print(f"📊 {len(keys)} permissions, {CACHE_ENTRIES} cache entries of {ROLES_PER_USER} roles x {KEYS_PER_ROLE} keys")
+    print(f"   memory  set[str]: {set_bytes / 1024:8.0f} KiB   mask: {mask_bytes / 1024:8.0f} KiB "
+          f"({set_bytes / mask_bytes:.1f}x smaller)")
+    print(f"   check   set[str]: {set_ns:6.1f} ns   PermissionChecker (cached flag AND): {mask_ns:6.1f} ns   "
+          f"per-call PermissionIndex.has: {has_ns:6.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
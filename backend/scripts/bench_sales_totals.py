@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+import time
+import statistics
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from beanie import init_beanie, PydanticObjectId
+from app.core.config import settings
+from app.models.item import Item
+from app.models.tax import Tax
+from app.services.sales_service import sales_service
+from app.services.cache import master_cache
+from app.schemas.sales import SalesItemBase
+
+LINE_COUNTS = [1, 10, 50, 200]
+TAXES_PER_LINE = 2
+RUNS = 5
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts commands sent to the server so each run can report its round trips."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def legacy_calculate_totals(items_in, company_id):
+    """The previous per-line implementation, kept here as the baseline."""
+    subtotal = 0.0
+    tax_total = 0.0
+    for item_data in items_in:
+        item_master = await Item.get(item_data.item_id)
+        if not item_master:
+            continue
+        line_subtotal = item_data.qty * item_data.price
+        line_tax_amount = 0.0
+        for tax_id in item_data.tax_ids:
+            tax_master = await Tax.get(tax_id)
+            if tax_master:
+                line_tax_amount += (line_subtotal * (tax_master.rate / 100))
+        subtotal += line_subtotal
+        tax_total += line_tax_amount
+    return subtotal, tax_total
+
+
+async def measure(counter, fn, items_in, company_id):
+    timings = []
+    trips = 0
+    for _ in range(RUNS):
+        # Measure the database path, not cache hits from the previous run
+        master_cache.clear()
+        counter.count = 0
+        start = time.perf_counter()
+        await fn(items_in, company_id)
+        timings.append((time.perf_counter() - start) * 1000)
+        trips = counter.count
+    return trips, statistics.median(timings)
+
+
+async def main():
+    counter = RoundTripCounter()
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[counter])
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[Item, Tax])
+
+    # Scratch tenant so the benchmark never touches real company data
+    company_id = PydanticObjectId()
+    max_lines = max(LINE_COUNTS)
+
+    taxes = [
+        Tax(company_id=company_id, name=f"Bench Tax {i}", rate=9, tax_type="GST")
+        for i in range(TAXES_PER_LINE)
+    ]
+    await Tax.insert_many(taxes)
+    taxes = await Tax.find(Tax.company_id == company_id).to_list()
+
+    items = [
+        Item(company_id=company_id, name=f"Bench Item {i}", item_type="PRODUCT", unit="PCS", sale_price=100)
+        for i in range(max_lines)
+    ]
+    await Item.insert_many(items)
+    items = await Item.find(Item.company_id == company_id).to_list()
+
+    print(f"{'lines':>6} | {'legacy trips':>12} | {'legacy ms':>10} | {'batched trips':>13} | {'batched ms':>10}")
+    print("-" * 64)
+    try:
+        for n in LINE_COUNTS:
+            lines = [
+                SalesItemBase(item_id=item.id, qty=1, price=item.sale_price, tax_ids=[t.id for t in taxes])
+                for item in items[:n]
+            ]
+            legacy_trips, legacy_ms = await measure(counter, legacy_calculate_totals, lines, company_id)
+            batched_trips, batched_ms = await measure(counter, sales_service._calculate_totals, lines, company_id)
+            print(f"{n:>6} | {legacy_trips:>12} | {legacy_ms:>10.1f} | {batched_trips:>13} | {batched_ms:>10.1f}")
+    finally:
+        await Item.find(Item.company_id == company_id).delete()
+        await Tax.find(Tax.company_id == company_id).delete()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import random
+import sys
+import time
+import statistics
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie, PydanticObjectId
+from app.core.config import settings
+from app.core.tenant import set_tenant_id
+from app.models.customer import Customer
+from app.repositories.master_repos import customer_repo
+
+TOTAL_CUSTOMERS = 100_000
+TERMS = ["acme", "Globex", "initech 12", "zz"]
+RUNS = 5
+
+WORDS = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Soylent"]
+
+async def timed(query, sort):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await Customer.find(query).sort(sort).limit(100).to_list()
+        timings.append((time.perf_counter() - start) * 1000)
+    explain = await Customer.get_motor_collection().find(query).sort(sort).limit(100).explain()
+    examined = explain.get("executionStats", {}).get("totalDocsExamined", "?")
+    return statistics.median(timings), examined
+
+async def main():
+    # Throwaway database so seeding never touches a real tenant
+    db_name = f"{settings.DATABASE_NAME}_search_bench"
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(db_name)
+    await init_beanie(database=client[db_name], document_models=[Customer])
+
+    cid = PydanticObjectId()
+    set_tenant_id(cid)
+
+    print(f"🌱 Seeding {TOTAL_CUSTOMERS} customers...")
+    rng = random.Random(42)
+    batch = 10_000
+    for start in range(0, TOTAL_CUSTOMERS, batch):
+        docs = []
+        for i in range(start, min(start + batch, TOTAL_CUSTOMERS)):
+            data = customer_repo._normalize({"name": f"{rng.choice(WORDS)} {i} Ltd", "gst_number": f"29ABCDE{i:07d}"})
+            docs.append(Customer(company_id=cid, **data))
+        await Customer.insert_many(docs)
+
+    print(f"\n{'term':<12} {'mode':<22} {'median ms':>10} {'docs examined':>14}")
+    print("-" * 62)
+    for term in TERMS:
+        shapes = [
+            ("legacy $regex /i", {"name": {"$regex": term, "$options": "i"}}),
+            ("indexed prefix", customer_repo.search_filter(term)),
+            ("escaped contains", customer_repo.search_filter(term, contains=True)),
+        ]
+        for mode, filters in shapes:
+            query, sort = customer_repo.list_query(filters=filters)
+            ms, examined = await timed(query, sort)
+            print(f"{term:<12} {mode:<22} {ms:>10.2f} {examined:>14}")
+
+    await client.drop_database(db_name)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.core.tenant import set_tenant_id
+from app.models.user import User
+from app.models.company import Company
+from app.models.role import Role
+from app.models.customer import Customer
+from app.models.vendor import Vendor
+from app.models.item import Item
+from app.models.category import ItemCategory
+from app.models.tax import Tax
+from app.models.price_list import PriceList
+from app.models.sequence import Sequence
+from app.models.sales import Quotation, SalesOrder, Invoice, CreditNote
+from app.repositories.master_repos import (
+    customer_repo, vendor_repo, item_repo, category_repo, tax_repo, price_list_repo
+)
+from app.repositories.sales_repos import (
+    quotation_repo, sales_order_repo, invoice_repo, credit_note_repo
+)
+
+MASTER_REPOS = [customer_repo, vendor_repo, item_repo, category_repo, tax_repo, price_list_repo]
+SALES_REPOS = [quotation_repo, sales_order_repo, invoice_repo, credit_note_repo]
+
+# Indexes declared by earlier model versions. The compound (company_id, ...)
+# indexes replace the single-field ones; invoice/quote/order numbers used to be
+# unique across all tenants, which breaks as soon as two companies share a prefix.
+# The non-unique search indexes have the same keys as their unique replacements,
+# so they must be dropped before the models' indexes can be created.
+LEGACY_INDEXES = {
+    Customer: ["name_1", "company_name_lower", "company_gst_normalized"],
+    Vendor: ["name_1", "company_name_lower"],
+    Item: ["name_1", "company_name_lower", "company_sku_normalized"],
+    ItemCategory: ["name_1", "company_name_lower"],
+    Tax: ["name_1"],
+    PriceList: ["name_1"],
+    Quotation: ["quote_number_1"],
+    SalesOrder: ["order_number_1"],
+    Invoice: ["invoice_number_1"],
+    CreditNote: ["credit_note_number_1"],
+    # Non-unique twin of company_entity_unique; blocks its creation
+    Sequence: ["company_id_1_entity_1"],
+}
+
+FLAGGED_STAGES = {
+    "COLLSCAN": "collection scan",
+    "SORT": "in-memory sort",
+}
+
+def plan_stages(plan) -> list:
+    """Collects every stage name in an explain() plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+def index_names(plan) -> list:
+    names = []
+    if isinstance(plan, dict):
+        if "indexName" in plan:
+            names.append(plan["indexName"])
+        for value in plan.values():
+            names.extend(index_names(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            names.extend(index_names(value))
+    return names
+
+def query_shapes(cid: PydanticObjectId):
+    """Yields (model, description, filter, sort) for every repository query shape."""
+    sample_id = PydanticObjectId()
+
+    for repo in MASTER_REPOS + SALES_REPOS:
+        model = repo.model
+        yield model, "get by id", {"_id": sample_id, "company_id": cid, "is_active": True}, None
+        for sort_by in repo.sort_fields:
+            for order in (ASCENDING, DESCENDING):
+                query, sort = repo.list_query(sort_by=sort_by, sort_order=order)
+                direction = "asc" if order == ASCENDING else "desc"
+                yield model, f"list sorted by {sort_by} {direction}", query, sort
+
+    for repo in MASTER_REPOS:
+        if repo.unique_fields:
+            yield repo.model, "duplicate name check", {"company_id": cid, "name_lower": "sample"}, None
+        if repo.normalized_fields:
+            query, sort = repo.list_query(filters=repo.search_filter("sample"))
+            yield repo.model, "prefix search", query, sort
+            query, sort = repo.list_query(filters=repo.search_filter("sample", contains=True))
+            yield repo.model, "contains search", query, sort
+
+    query, sort = item_repo.list_query(filters={"item_type": "PRODUCT"})
+    yield Item, "list by item_type", query, sort
+    yield Item, "items in category", {"category_id": sample_id, "company_id": cid}, None
+
+    for repo in SALES_REPOS[:3]:
+        yield repo.model, "status filter, newest first", \
+            {"company_id": cid, "is_active": True, "status": "DRAFT"}, [("created_at", DESCENDING)]
+
+    yield User, "company members", {"company_ids": cid}, None
+    yield Role, "company roles", {"company_id": cid}, None
+    yield Sequence, "next number", {"company_id": cid, "entity": "invoice"}, None
+
+async def explain_shapes(cid: PydanticObjectId) -> int:
+    flagged = 0
+    print(f"{'collection':<16} {'query shape':<34} {'index':<32} findings")
+    print("-" * 100)
+    for model, description, query, sort in query_shapes(cid):
+        cursor = model.get_motor_collection().find(query).limit(100)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+        stages = plan_stages(winning)
+        findings = [FLAGGED_STAGES[s] for s in FLAGGED_STAGES if s in stages]
+        used = ", ".join(sorted(set(index_names(winning)))) or "-"
+        if findings:
+            flagged += 1
+        marker = "⚠️  " + ", ".join(findings) if findings else "ok"
+        print(f"{model.get_collection_name():<16} {description:<34} {used:<32} {marker}")
+    return flagged
+
+async def report_legacy_indexes(drop: bool):
+    for model, names in LEGACY_INDEXES.items():
+        collection = model.get_motor_collection()
+        existing = await collection.index_information()
+        for name in names:
+            if name not in existing:
+                continue
+            if drop:
+                await collection.drop_index(name)
+                print(f"🗑  Dropped legacy index {model.get_collection_name()}.{name}")
+            else:
+                print(f"⚠️  Legacy index {model.get_collection_name()}.{name} still present (use --drop-legacy)")
+
+async def main(company_id: str, drop_legacy: bool):
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    models = [
+        User, Company, Role, Customer, Vendor, Item, ItemCategory, Tax, PriceList,
+        Sequence, Quotation, SalesOrder, Invoice, CreditNote
+    ]
+    # Legacy indexes can block creation of their replacements, so handle them first
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=models, skip_indexes=True)
+    await report_legacy_indexes(drop_legacy)
+    print()
+
+    # init_beanie creates every index declared on the models
+    try:
+        await init_beanie(database=client[settings.DATABASE_NAME], document_models=models)
+    except OperationFailure as e:
+        print(f"❌ Could not create model indexes: {e}")
+        print("   Drop legacy indexes (--drop-legacy) and resolve duplicates (backfill_search_fields.py) first")
+        sys.exit(1)
+
+    if company_id:
+        cid = PydanticObjectId(company_id)
+    else:
+        company = await Company.find_one()
+        cid = company.id if company else PydanticObjectId()
+    set_tenant_id(cid)
+    print(f"🔎 Explaining query shapes for company {cid}\n")
+
+    flagged = await explain_shapes(cid)
+    print(f"\n{'❌' if flagged else '🎯'} {flagged} query shape(s) flagged")
+    sys.exit(1 if flagged else 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Explain every repository query shape and flag collection scans")
+    parser.add_argument("--company-id", help="Tenant to explain against (defaults to the first company)")
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop single-field indexes replaced by compound ones")
+    args = parser.parse_args()
+    asyncio.run(main(args.company_id, args.drop_legacy))
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie, PydanticObjectId
+from app.core.config import settings
+from app.models.company_stats import CompanyStats
+from app.models.sales import (
+    Quotation, Invoice, OPEN_QUOTATION_STATUSES, UNPAID_INVOICE_STATUSES, BILLED_INVOICE_STATUSES
+)
+
+# Counters are recomputed from the documents and replaced wholesale, so
+# increments made by requests while this runs can be lost: run it when quiet.
+
+async def backfill_issued_at(match: dict) -> int:
+    """Invoices billed before issued_at existed count as issued when last updated."""
+    result = await Invoice.get_motor_collection().update_many(
+        {**match, "status": {"$in": list(BILLED_INVOICE_STATUSES)}, "issued_at": None},
+        [{"$set": {"issued_at": "$updated_at"}}]
+    )
+    return result.modified_count
+
+async def aggregate_counters(match: dict) -> dict:
+    stats = defaultdict(lambda: {"open_quotations": 0, "unpaid_invoice_total": 0.0, "revenue_by_month": {}})
+
+    pipeline = [
+        {"$match": {**match, "is_active": True, "status": {"$in": list(OPEN_QUOTATION_STATUSES)}}},
+        {"$group": {"_id": "$company_id", "count": {"$sum": 1}}},
+    ]
+    async for row in Quotation.get_motor_collection().aggregate(pipeline):
+        stats[row["_id"]]["open_quotations"] = row["count"]
+
+    pipeline = [
+        {"$match": {**match, "is_active": True, "status": {"$in": list(UNPAID_INVOICE_STATUSES)}}},
+        {"$group": {"_id": "$company_id", "total": {"$sum": "$grand_total"}}},
+    ]
+    async for row in Invoice.get_motor_collection().aggregate(pipeline):
+        stats[row["_id"]]["unpaid_invoice_total"] = row["total"]
+
+    pipeline = [
+        {"$match": {**match, "is_active": True, "status": {"$in": list(BILLED_INVOICE_STATUSES)},
+                    "issued_at": {"$type": "date"}}},
+        {"$group": {
+            "_id": {"company_id": "$company_id",
+                    "month": {"$dateToString": {"format": "%Y-%m", "date": "$issued_at"}}},
+            "total": {"$sum": "$grand_total"}
+        }},
+    ]
+    async for row in Invoice.get_motor_collection().aggregate(pipeline):
+        stats[row["_id"]["company_id"]]["revenue_by_month"][row["_id"]["month"]] = row["total"]
+
+    return stats
+
+async def main(company_id: str):
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[CompanyStats, Quotation, Invoice])
+
+    match = {"company_id": PydanticObjectId(company_id)} if company_id else {}
+    backfilled = await backfill_issued_at(match)
+    if backfilled:
+        print(f"🗓  Set issued_at on {backfilled} previously issued invoice(s)")
+
+    stats = await aggregate_counters(match)
+    collection = CompanyStats.get_motor_collection()
+    # Companies whose documents no longer contribute anything are reset to zero
+    async for doc in collection.find(match, {"company_id": 1}):
+        stats[doc["company_id"]]
+
+    for cid, counters in stats.items():
+        await collection.update_one(
+            {"company_id": cid},
+            {"$set": {**counters, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        month = counters["revenue_by_month"].get(datetime.utcnow().strftime("%Y-%m"), 0.0)
+        print(f"✅ {cid}: {counters['open_quotations']} open quotations, "
+              f"{counters['unpaid_invoice_total']:.2f} unpaid, {month:.2f} revenue this month")
+
+    print(f"\n🎯 Rebuilt stats for {len(stats)} company(ies)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute the pre-aggregated dashboard sales counters")
+    parser.add_argument("--company-id", help="Only rebuild this company (defaults to all)")
+    args = parser.parse_args()
+    asyncio.run(main(args.company_id))
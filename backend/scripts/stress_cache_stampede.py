@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sys
+from collections import Counter
+from types import SimpleNamespace
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from beanie import init_beanie, PydanticObjectId
+from app.core.config import settings
+from app.core.tenant import set_tenant_id
+from app.models.user import User
+from app.models.role import Role
+from app.models.permission import Permission
+from app.models.item import Item
+from app.api.deps import get_my_permission_mask, _load_permission_mask, permission_loads
+from app.repositories.base import master_loads
+from app.repositories.master_repos import item_repo
+from app.services.cache import master_cache, user_cache
+from app.services.permission_cache import permission_cache
+from app.services.permission_index import permission_index
+
+CONCURRENCY = 200
+QUERY_COMMANDS = {"find", "aggregate"}
+
+
+class QueryCounter(monitoring.CommandListener):
+    """Counts reads per collection so each stampede can report its database loads."""
+
+    def __init__(self):
+        self.reads = Counter()
+
+    def started(self, event):
+        if event.command_name in QUERY_COMMANDS:
+            self.reads[event.command.get(event.command_name)] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def cold_caches():
+    permission_cache.l1.clear()
+    user_cache.clear()
+    master_cache.clear()
+
+
+async def stampede(counter, label, make_call):
+    """Fires CONCURRENCY identical calls against cold caches and reports the reads they caused."""
+    cold_caches()
+    counter.reads.clear()
+    results = await asyncio.gather(*(make_call() for _ in range(CONCURRENCY)))
+    assert len({repr(r) for r in results}) == 1, f"{label}: callers saw different results"
+    reads = ", ".join(f"{name}={count}" for name, count in sorted(counter.reads.items())) or "none"
+    print(f"{label:<40} {CONCURRENCY:>5} callers -> {sum(counter.reads.values()):>4} reads ({reads})")
+
+
+async def main():
+    counter = QueryCounter()
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[counter])
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[User, Role, Permission, Item])
+    await permission_index.load()
+
+    # Scratch tenant so the stress run never touches real company data
+    company_id = PydanticObjectId()
+    set_tenant_id(company_id)
+    keys = list(permission_index._flags)[:10]
+    role = await Role(company_id=company_id, name="Stampede Role", permission_keys=keys).insert()
+    user = await User(
+        email=f"stampede-{company_id}@example.com", password_hash="-",
+        company_ids=[company_id], active_company_id=company_id, role_ids=[role.id]
+    ).insert()
+    item = await Item(company_id=company_id, name="Stampede Item", item_type="PRODUCT", unit="PCS").insert()
+
+    request = SimpleNamespace(state=SimpleNamespace(user_id=str(user.id), active_company_id=str(company_id)))
+
+    async def uncoalesced_mask():
+        # What every request did on a miss before single-flight
+        _, token = await permission_cache.lookup(user.id, company_id)
+        return await _load_permission_mask(str(user.id), str(company_id), token)
+
+    async def uncoalesced_item():
+        return await Item.find_one(Item.id == item.id, Item.company_id == company_id)
+
+    print(f"🔥 {CONCURRENCY} concurrent misses on one key, cold caches\n")
+    try:
+        await stampede(counter, "permission mask (one load per request)", uncoalesced_mask)
+        await stampede(counter, "permission mask (single-flight)", lambda: get_my_permission_mask(request))
+        await stampede(counter, "item by id (one load per request)", uncoalesced_item)
+        await stampede(counter, "item by id (single-flight)", lambda: item_repo.get(item.id))
+        print(f"\n📊 permission loads {permission_loads.stats()}")
+        print(f"📊 master loads     {master_loads.stats()}")
+    finally:
+        await Item.find(Item.company_id == company_id).delete()
+        await Role.find(Role.company_id == company_id).delete()
+        await user.delete()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie, PydanticObjectId
+from app.core.config import settings
+from app.models.customer import Customer
+from app.models.item import Item
+from app.models.tax import Tax
+from app.models.sequence import Sequence, get_next_sequence_number
+from app.models.sales import Invoice
+from app.services.sales_service import sales_service
+from app.schemas.sales import InvoiceCreate, SalesItemBase
+
+TOTAL_INVOICES = 10_000
+WORKERS = 50
+
+async def main(leased: bool):
+    # Run against a throwaway database so generated numbers never clash with real invoices
+    db_name = f"{settings.DATABASE_NAME}_sequence_stress"
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(db_name)
+    await init_beanie(
+        database=client[db_name],
+        document_models=[Customer, Item, Tax, Sequence, Invoice]
+    )
+
+    cid = PydanticObjectId()
+    customer = Customer(company_id=cid, name="Stress Customer")
+    await customer.insert()
+    item = Item(company_id=cid, name="Stress Item", item_type="PRODUCT", unit="PCS", sale_price=10)
+    await item.insert()
+
+    inv_in = InvoiceCreate(
+        customer_id=customer.id,
+        items=[SalesItemBase(item_id=item.id, qty=1, price=item.sale_price)]
+    )
+
+    if leased:
+        # Same flow as create_invoice, but numbering from per-worker leased blocks
+        async def create_one():
+            number = await get_next_sequence_number(cid, "invoice", "INV-", leased=True)
+            items, subtotal, tax_total, grand_total = await sales_service._calculate_totals(inv_in.items, cid)
+            await Invoice(
+                company_id=cid, invoice_number=number, customer_id=customer.id,
+                customer_name=customer.name, items=items, subtotal=subtotal,
+                tax_total=tax_total, grand_total=grand_total
+            ).insert()
+    else:
+        async def create_one():
+            await sales_service.create_invoice(inv_in, cid)
+
+    per_worker = TOTAL_INVOICES // WORKERS
+    errors = []
+
+    async def worker():
+        for _ in range(per_worker):
+            try:
+                await create_one()
+            except Exception as e:
+                errors.append(e)
+
+    mode = "leased blocks" if leased else "atomic $inc"
+    print(f"🚀 Creating {TOTAL_INVOICES} invoices from {WORKERS} coroutines ({mode})...")
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(WORKERS)))
+    elapsed = time.perf_counter() - start
+
+    numbers = await Invoice.get_motor_collection().distinct("invoice_number", {"company_id": cid})
+    stored = await Invoice.find(Invoice.company_id == cid).count()
+
+    print(f"⏱  {elapsed:.1f}s ({TOTAL_INVOICES / elapsed:.0f} invoices/s)")
+    print(f"📊 Stored: {stored}, distinct numbers: {len(numbers)}, errors: {len(errors)}")
+    for e in errors[:5]:
+        print(f"   {type(e).__name__}: {e}")
+
+    await client.drop_database(db_name)
+
+    if errors or stored != TOTAL_INVOICES or len(numbers) != TOTAL_INVOICES:
+        print("❌ Duplicate or missing invoice numbers detected")
+        sys.exit(1)
+    print("🎯 No duplicates.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrency stress test for document numbering")
+    parser.add_argument("--leased", action="store_true", help="Use per-worker leased number blocks")
+    asyncio.run(main(parser.parse_args().leased))
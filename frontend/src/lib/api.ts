@@ -19,6 +19,24 @@ api.interceptors.request.use((config) => {
   return config;
 }, (error) => Promise.reject(error));
 
+// One refresh at a time: the server treats a second use of a refresh token as reuse
+let refreshing: Promise<string> | null = null;
+
+const refreshAccessToken = (refreshToken: string): Promise<string> => {
+  if (!refreshing) {
+    refreshing = axios.post(`${API_BASE_URL}/auth/refresh`, {
+      refresh_token: refreshToken
+    }).then((response) => {
+      const { access_token, refresh_token } = response.data;
+      setTokens(access_token, refresh_token);
+      return access_token as string;
+    }).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
 // Response Interceptor: Handle Refresh
 api.interceptors.response.use(
   (response) => response,
@@ -33,17 +51,18 @@ api.interceptors.response.use(
       if (refreshToken) {
         try {
           // Token Refresh Call
-          const response = await axios.post(`${API_BASE_URL}/auth/refresh`, {
-            refresh_token: refreshToken
-          });
-
-          const { access_token, refresh_token } = response.data;
-          setTokens(access_token, refresh_token);
+          const accessToken = await refreshAccessToken(refreshToken);
 
           // Retry Original Request
-          originalRequest.headers.Authorization = `Bearer ${access_token}`;
+          originalRequest.headers.Authorization = `Bearer ${accessToken}`;
           return api(originalRequest);
         } catch (refreshError) {
+          // Another tab rotated the token first: use its pair instead of logging out
+          const accessToken = getAccessToken();
+          if (accessToken && getRefreshToken() !== refreshToken) {
+            originalRequest.headers.Authorization = `Bearer ${accessToken}`;
+            return api(originalRequest);
+          }
           clearTokens();
           window.location.href = '/login';
           return Promise.reject(refreshError);